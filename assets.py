@@ -0,0 +1,411 @@
+import json
+import mmap
+import os
+import queue
+import threading
+import time
+
+import pygame
+
+FONT = "sprites/Oswald-Regular.ttf"
+
+# Index of the sprite atlas written by build_atlas.py, the game runs from the PNGs when it is missing
+ATLAS_INDEX = "sprites/atlas.json"
+
+
+"""
+    Make Mask Function
+        - This function is responsible for building the collision mask of a decoded image, scaled to
+        the given size
+"""
+
+
+def makeMask(surface, size=None):
+    if size is not None and surface.get_size() != tuple(size):
+        surface = pygame.transform.scale(surface, size)
+    return pygame.mask.from_surface(surface)
+
+"""
+    Assets Class
+        - This class is responsible for keeping track of...
+            - Every image that has been decoded from the sprites folder
+            - Every scaled and display-converted copy of those images
+            - Every font object, by path and size
+            - Every collision mask, by path and size
+            - Every static piece of text rendered through text()
+            - The sprite atlas, when one was built, which images and masks come from before any PNG
+        - This class also counts cache hits, misses and disk loads so we can check that
+          level transitions never go back to disk
+        - This class also counts text renders, so we can check text is not re-rendered every frame
+            - The profiler overlay's own renders are counted apart, so showing the counters does not
+            change them
+"""
+
+
+class Assets:
+    def __init__(self):
+        self.raw = {}
+        self.images = {}
+        self.fonts = {}
+        self.texts = {}
+        self.masks = {}
+        self.maskBoxes = {}
+        self.atlas = None
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.renders = 0
+        self.overlayRenders = 0
+        self.started = time.perf_counter()
+
+    """
+        Load Function
+            - This function is responsible for decoding an image from disk
+            - Each file is only ever decoded once, every other request reuses the decoded surface
+    """
+
+    def load(self, path):
+        surface = self.raw.get(path)
+        if surface is None:
+            surface = pygame.image.load(path)
+            self.raw[path] = surface
+            self.loads += 1
+        return surface
+
+    """
+        Image Function
+            - This function is responsible for handing out a ready to blit copy of an image
+            - The image is scaled to the given size, and converted to the display's pixel format
+            so that blitting it does not pay for a format conversion every frame
+            - Images without transparency can pass alpha=False to get a faster opaque surface
+            - Images in the atlas are handed out as a piece of it instead, already at their size and in
+            the display's format, alpha or not, other sizes of them are scaled from the atlas
+    """
+
+    def image(self, path, size=None, alpha=True):
+        key = (path, size, alpha)
+        surface = self.images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if self.atlas is not None:
+            surface = self.atlas.sprite(path, size)
+            if surface is not None:
+                self.images[key] = surface
+                return surface
+
+        # A size the atlas was not built for is scaled from the atlas's copy, rather than decoded again
+        if self.atlas is not None and self.atlas.has(path):
+            surface = self.atlas.pixels(path)
+        else:
+            surface = self.load(path)
+        if size is not None and surface.get_size() != tuple(size):
+            surface = pygame.transform.scale(surface, size)
+
+        # Converting needs a display mode, headless runs keep the decoded format
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if alpha else surface.convert()
+
+        self.images[key] = surface
+        return surface
+
+    """
+        Mask Function
+            - This function is responsible for handing out the collision mask of an image
+            - The mask is built from the image's alpha, scaled to the given size, once per path and size
+            - Masks are built from the decoded image, so they work headless and never leave an
+            unconverted copy in the image cache
+    """
+
+    def mask(self, path, size=None):
+        key = (path, size)
+        mask = self.masks.get(key)
+        if mask is not None:
+            self.hits += 1
+            return mask
+
+        self.misses += 1
+        surface = self.atlas.pixels(path, size) if self.atlas is not None else None
+        mask = makeMask(self.load(path), size) if surface is None else pygame.mask.from_surface(surface)
+        self.masks[key] = mask
+        return mask
+
+    """
+        Mask Box Function
+            - This function is responsible for handing out the smallest rect around the set pixels of a mask
+            - Two sprites can only touch where their boxes overlap, which is much cheaper to test than
+            their masks
+    """
+
+    def maskBox(self, path, size=None):
+        key = (path, size)
+        box = self.maskBoxes.get(key)
+        if box is None:
+            rects = self.mask(path, size).get_bounding_rects()
+            box = rects[0].unionall(rects[1:]) if rects else pygame.Rect(0, 0, 0, 0)
+            self.maskBoxes[key] = box
+        return box
+
+    """
+        Font Function
+            - This function is responsible for handing out a font object for a path and size
+            - Font objects are kept alive so the font file is only opened once
+    """
+
+    def font(self, path, size):
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+
+        self.misses += 1
+        self.loads += 1
+        font = pygame.font.Font(path, size)
+        self.fonts[key] = font
+        return font
+
+    """
+        Render Function
+            - This function is responsible for rendering a piece of text with a font
+            - Every render goes through here so the render counter stays accurate
+            - overlay marks the profiler overlay's renders, which go to overlayRenders instead
+    """
+
+    def render(self, font, message, color=(0, 0, 0), overlay=False):
+        if overlay:
+            self.overlayRenders += 1
+        else:
+            self.renders += 1
+        return font.render(message, True, color)
+
+    """
+        Text Function
+            - This function is responsible for handing out a rendered piece of text that never changes
+            - Each message is only rendered once, for screens like the intro and the game over screen
+    """
+
+    def text(self, message, size=24, color=(0, 0, 0), path=FONT):
+        key = (message, size, color, path)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.render(self.font(path, size), message, color)
+        self.texts[key] = surface
+        return surface
+
+    """
+        Stats Function
+            - This function is responsible for reporting the cache counters
+            - rendersPerMinute is the text render rate since the registry was created
+    """
+
+    def stats(self):
+        minutes = (time.perf_counter() - self.started) / 60
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "renders": self.renders,
+            "overlayRenders": self.overlayRenders,
+            "rendersPerMinute": self.renders / minutes if minutes > 0 else 0.0,
+        }
+
+
+"""
+    Atlas Class
+        - This class is responsible for the sprite atlas written by build_atlas.py
+            - Every sprite, already scaled to the sizes the game draws it at, packed into one image
+            - The image's raw pixels are memory-mapped straight from disk, there is no PNG to decode
+            - The index lists each sprite's (path, size) and where it sits in the image, a size of None
+            is the sprite's own size
+            - Paths in the index are file names in the index's folder, the atlas looks sprites up by
+            folder and name, like the rest of the game asks for them
+        - pixels() hands out a sprite as a subsurface of the mapped pixels, which works headless and from
+        any thread
+        - sprite() hands out a subsurface of a copy of the whole atlas converted to the display's format
+        the first time it is asked with a display, so every sprite shares that one surface
+"""
+
+
+class Atlas:
+    def __init__(self, indexPath=ATLAS_INDEX, index=None):
+        if index is None:
+            with open(indexPath) as file:
+                index = json.load(file)
+        folder = os.path.dirname(indexPath)
+        self.size = tuple(index["size"])
+        with open(os.path.join(folder, index["pixels"]), "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.surface = pygame.image.frombuffer(self.buffer, self.size, index["format"])
+        self.converted = None
+        self.rects = {}
+        for entry in index["sprites"]:
+            size = tuple(entry["size"]) if entry["size"] is not None else None
+            self.rects[(os.path.join(folder, entry["path"]), size)] = pygame.Rect(entry["rect"])
+
+    """
+        Open Function
+            - This function is responsible for opening the atlas, if there is an up to date one
+            - Returns None when it was never built, or when a sprite changed after it was
+    """
+
+    @staticmethod
+    def open(indexPath=ATLAS_INDEX):
+        try:
+            with open(indexPath) as file:
+                index = json.load(file)
+            folder = os.path.dirname(indexPath)
+            for name, modified in index["sources"].items():
+                if os.stat(os.path.join(folder, name)).st_mtime_ns > modified:
+                    return None
+        except OSError:
+            return None
+        return Atlas(indexPath, index)
+
+    """
+        Rect Function
+            - This function is responsible for finding where a sprite is in the atlas
+            - A sprite asked for at its own size is found as well
+    """
+
+    def rect(self, path, size=None):
+        rect = self.rects.get((path, None if size is None else tuple(size)))
+        if rect is None and size is not None:
+            rect = self.rects.get((path, None))
+            if rect is not None and rect.size != tuple(size):
+                rect = None
+        return rect
+
+    def has(self, path):
+        return (path, None) in self.rects
+
+    def pixels(self, path, size=None):
+        rect = self.rect(path, size)
+        return self.surface.subsurface(rect) if rect is not None else None
+
+    def sprite(self, path, size=None):
+        rect = self.rect(path, size)
+        if rect is None:
+            return None
+        if self.converted is None and pygame.display.get_surface() is not None:
+            self.converted = self.surface.convert_alpha()
+        surface = self.converted if self.converted is not None else self.surface
+        return surface.subsurface(rect)
+
+
+# Shared registry used by every part of the game
+assets = Assets()
+
+
+"""
+    Asset Loader Class
+        - This class is responsible for decoding every image in a folder on a worker thread, so the game
+        can keep drawing while they load
+            - The worker opens the folder's sprite atlas, decodes the images that are not in it, and builds
+            the collision masks in masks, a list of (path, size), none of which needs the display
+            - poll() hands what the worker finished to the registry on the main thread, and returns the
+            fraction loaded so far
+            - wait() blocks until everything is loaded
+        - Anything asked of the registry before the worker got to it is loaded on the spot as before, and
+        the worker's copy is dropped
+        - An image that fails to load raises its error from poll(), on the main thread
+"""
+
+
+class AssetLoader:
+    def __init__(self, folder, masks=(), registry=None):
+        self.registry = assets if registry is None else registry
+        self.paths = [f"{folder}/{name}" for name in sorted(os.listdir(folder)) if name.endswith(".png")]
+        self.masks = list(masks)
+        self.atlasIndex = f"{folder}/atlas.json"
+        self.total = 1 + len(self.paths) + len(self.masks)
+        self.done = 0
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    @property
+    def ready(self):
+        return self.done == self.total
+
+    """
+        Run Function
+            - This function is responsible for the worker thread's side of loading
+            - The registry is only read here, never written to
+    """
+
+    def run(self):
+        registry = self.registry
+        decoded = {}
+        try:
+            atlas = registry.atlas or Atlas.open(self.atlasIndex)
+            self.results.put(("atlas", None, atlas))
+
+            for path in self.paths:
+                if atlas is not None and atlas.has(path):
+                    self.results.put(("skip", path, None))
+                    continue
+                surface = registry.raw.get(path)
+                if surface is None:
+                    surface = pygame.image.load(path)
+                decoded[path] = surface
+                self.results.put(("raw", path, surface))
+
+            for path, size in self.masks:
+                mask = registry.masks.get((path, size))
+                if mask is None:
+                    surface = atlas.pixels(path, size) if atlas is not None else None
+                    if surface is not None:
+                        mask = pygame.mask.from_surface(surface)
+                    else:
+                        surface = decoded.get(path)
+                        mask = makeMask(pygame.image.load(path) if surface is None else surface, size)
+                self.results.put(("mask", (path, size), mask))
+        except Exception as error:
+            self.results.put(("error", None, error))
+
+    """
+        Poll Function
+            - This function is responsible for handing finished images and masks to the registry
+            - Never blocks, whatever is not finished yet is picked up by a later poll
+    """
+
+    def poll(self):
+        registry = self.registry
+        while True:
+            try:
+                kind, key, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "error":
+                raise value
+            if kind == "atlas":
+                if registry.atlas is None:
+                    registry.atlas = value
+            elif kind == "raw":
+                if key not in registry.raw:
+                    registry.raw[key] = value
+                    registry.loads += 1
+            elif kind == "mask":
+                registry.masks.setdefault(key, value)
+            self.done += 1
+        return self.done / self.total if self.total else 1.0
+
+    """
+        Wait Function
+            - This function is responsible for blocking until the worker is done, and handing everything
+            it loaded to the registry
+    """
+
+    def wait(self):
+        self.thread.join()
+        return self.poll()
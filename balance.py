@@ -0,0 +1,205 @@
+import argparse
+import itertools
+import json
+import random
+import time
+from multiprocessing import Pool
+
+from frogger_game_class import World, CAR_CHANCE, SPEED_RAMP
+
+"""
+    Balance Runner
+        - This script plays large numbers of seeded headless games to measure how hard each level is
+            - Games are split into seed ranges, one range per task, run across a process pool
+            - Each game runs until its lives run out or it reaches --max-minutes of play
+            - Per level it reports how many games reached it, the share that finished it, lives lost
+            per attempt, and the mean time to finish it
+        - Difficulty can be swept, every combination of --car-chance and --speed-ramp gets its own report
+        - Run it with: python balance.py --games 10000 --policy scripted --car-chance 0.3 0.5 0.7
+"""
+
+
+"""
+    Random Policy
+        - This function is responsible for picking a random move, mostly waiting and mostly hopping forward
+"""
+
+
+def randomPolicy(world, rng):
+    roll = rng.random()
+    if roll < 0.75:
+        return []
+    if roll < 0.9:
+        return ["down"]
+    return [rng.choice(("left", "right", "up"))]
+
+
+"""
+    Scripted Policy
+        - This function is responsible for hopping forward whenever the hop looks safe
+            - A car lane is safe when no car is within a second of driving into the frog
+            - A water lane is safe when a boat's pixels are under where the frog lands
+"""
+
+
+def scriptedPolicy(world, rng):
+    frog = world.frog
+    nextLane = frog.rect.centery // 128 + 1
+    if nextLane >= len(world.lanes):
+        return []
+
+    lane = world.lanes[nextLane]
+    landing = frog.rect.move(0, 128)
+    if lane.type == "car":
+        for obstacle in lane.obstacles:
+            reach = abs(obstacle.velocity)
+            if landing.inflate(2 * reach, 0).colliderect(obstacle.rect):
+                return []
+    elif lane.type == "water":
+        for obstacle in lane.obstacles:
+            rect = obstacle.rect
+            if frog.mask.overlap(lane.mask, (rect.x - landing.x, rect.y - landing.y)):
+                return ["down"]
+        return []
+    return ["down"]
+
+
+POLICIES = {"random": randomPolicy, "scripted": scriptedPolicy}
+
+
+"""
+    Play Game Function
+        - This function is responsible for playing one seeded game and adding its numbers to stats
+        - stats maps each level to [games that reached it, finishes, lives lost, ticks spent finishing it]
+"""
+
+
+def playGame(seed, policy, maxTicks, obsCnt, carChance, speedRamp, stats):
+    world = World(obsCnt=obsCnt, seed=seed, carChance=carChance, speedRamp=speedRamp)
+    world.reset()
+    rng = random.Random(seed)
+
+    level = world.score.level
+    lives = world.score.lives
+    started = world.tick
+    stats.setdefault(level, [0, 0, 0, 0])[0] += 1
+    while not world.score.gameover and world.tick < maxTicks:
+        world.step(policy(world, rng))
+
+        if world.score.lives != lives:
+            stats[level][2] += lives - world.score.lives
+            lives = world.score.lives
+        if world.score.level != level:
+            stats[level][1] += 1
+            stats[level][3] += world.tick - started
+            level = world.score.level
+            started = world.tick
+            stats.setdefault(level, [0, 0, 0, 0])[0] += 1
+
+
+"""
+    Run Range Function
+        - This function is responsible for playing the games of one seed range, in a worker process
+        - Returns the config it ran and the stats of its games
+"""
+
+
+def runRange(task):
+    config, start, stop, policy, maxTicks, obsCnt = task
+    carChance, speedRamp = config
+    stats = {}
+    for seed in range(start, stop):
+        playGame(seed, POLICIES[policy], maxTicks, obsCnt, carChance, speedRamp, stats)
+    return config, stats
+
+
+"""
+    Merge Function
+        - This function is responsible for adding the stats of one seed range to the totals
+"""
+
+
+def merge(totals, stats):
+    for level, counts in stats.items():
+        total = totals.setdefault(level, [0, 0, 0, 0])
+        for i, count in enumerate(counts):
+            total[i] += count
+
+
+"""
+    Report Function
+        - This function is responsible for turning one config's totals into rows per level
+"""
+
+
+def report(totals, simHz):
+    rows = []
+    for level in sorted(totals):
+        reached, finished, livesLost, ticks = totals[level]
+        rows.append(
+            {
+                "level": level,
+                "reached": reached,
+                "survival": finished / reached if reached else 0.0,
+                "livesLost": livesLost / reached if reached else 0.0,
+                "timeToFinish": ticks / finished / simHz if finished else None,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure level difficulty over many headless games")
+    parser.add_argument("--games", type=int, default=1000, help="games per difficulty setting")
+    parser.add_argument("--seed", type=int, default=0, help="first seed, games use consecutive seeds")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="scripted")
+    parser.add_argument("--workers", type=int, default=None, help="processes, every core when not given")
+    parser.add_argument("--chunk", type=int, default=50, help="games per task handed to a worker")
+    parser.add_argument("--max-minutes", type=float, default=5, help="longest a game may be played")
+    parser.add_argument("--obs-cnt", type=int, default=1, help="obstacles per lane")
+    parser.add_argument("--car-chance", type=float, nargs="+", default=[CAR_CHANCE])
+    parser.add_argument("--speed-ramp", type=int, nargs="+", default=[SPEED_RAMP])
+    parser.add_argument("--out", metavar="PATH", help="also save the report as JSON")
+    args = parser.parse_args()
+
+    simHz = 30
+    maxTicks = int(args.max_minutes * 60 * simHz)
+    configs = list(itertools.product(args.car_chance, args.speed_ramp))
+    tasks = []
+    for config in configs:
+        for start in range(args.seed, args.seed + args.games, args.chunk):
+            stop = min(start + args.chunk, args.seed + args.games)
+            tasks.append((config, start, stop, args.policy, maxTicks, args.obs_cnt))
+
+    start = time.perf_counter()
+    totals = {config: {} for config in configs}
+    with Pool(args.workers) as pool:
+        for config, stats in pool.imap_unordered(runRange, tasks):
+            merge(totals[config], stats)
+    elapsed = time.perf_counter() - start
+
+    results = []
+    for config in configs:
+        carChance, speedRamp = config
+        rows = report(totals[config], simHz)
+        results.append({"carChance": carChance, "speedRamp": speedRamp, "levels": rows})
+
+        print(f"car chance {carChance}, speed ramp every {speedRamp} levels, {args.policy} policy")
+        print(f"{'level':>5} {'reached':>8} {'survival':>9} {'lives lost':>11} {'finish s':>9}")
+        for row in rows:
+            finish = f"{row['timeToFinish']:.1f}" if row["timeToFinish"] is not None else "-"
+            print(
+                f"{row['level']:>5} {row['reached']:>8} {row['survival']:>9.1%} {row['livesLost']:>11.2f} {finish:>9}"
+            )
+        print()
+
+    games = args.games * len(configs)
+    print(f"{games} games in {elapsed:.1f} s, {games / elapsed:.0f} games per second")
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump({"policy": args.policy, "games": args.games, "configs": results}, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
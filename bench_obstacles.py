@@ -0,0 +1,127 @@
+import argparse
+import random
+import sys
+import time
+
+from frogger_game_class import World
+
+"""
+    Obstacle Benchmark
+        - This script compares the per-object obstacle update against the vectorized ObstacleStore
+        - Both paths move the same obstacles of a level 8 world, built from the same random seed,
+        and the final positions are compared so the two paths are known to agree
+        - It also plays the same random inputs through both paths with several obstacles per lane, where
+        the frog can land on more than one boat, and checks the games play out the same
+        - Run it with: python bench_obstacles.py --counts 1 10 100 1000
+"""
+
+
+"""
+    Make World Function
+        - This function is responsible for building a level 8 world with the given obstacles per lane
+"""
+
+
+def makeWorld(obsCnt, vectorized, seed):
+    world = World(obsCnt=obsCnt, vectorized=vectorized, seed=seed)
+    world.score.level = 8
+    world.makeLanes()
+    return world
+
+
+"""
+    Time Updates Function
+        - This function is responsible for timing how long one frame of obstacle movement takes
+"""
+
+
+def timeUpdates(world, frames):
+    if world.store is not None:
+
+        def update():
+            world.store.update(world.dt)
+
+    else:
+
+        def update():
+            for lane in world.lanes:
+                lane.update(world.dt)
+
+    start = time.perf_counter()
+    for i in range(frames):
+        update()
+    return (time.perf_counter() - start) / frames
+
+
+"""
+    Compare Play Function
+        - This function is responsible for stepping an object world and a vectorized world through the
+        same random inputs from level 1
+        - Returns the first tick the frog, lives or level differ, or None when they never do
+"""
+
+
+def comparePlay(obsCnt, seed, steps):
+    objects = World(obsCnt=obsCnt, seed=seed)
+    store = World(obsCnt=obsCnt, vectorized=True, seed=seed)
+    objects.reset()
+    store.reset()
+    rng = random.Random(seed)
+    for i in range(steps):
+        inputs = [rng.choice(["up", "up", "left", "right", "down"])] if rng.random() < 0.2 else []
+        objects.step(inputs)
+        store.step(inputs)
+        a = (objects.frog.pos_x, objects.frog.pos_y, objects.score.lives, objects.score.level)
+        b = (store.frog.pos_x, store.frog.pos_y, store.score.lives, store.score.level)
+        if a != b:
+            return objects.tick
+        if objects.score.gameOverCheck():
+            objects.reset()
+            store.reset()
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-object vs vectorized obstacle update")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50, 100, 500])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--play-counts", type=int, nargs="+", default=[2, 4, 6], help="obstacles per lane to play")
+    parser.add_argument("--play-seeds", type=int, default=5, help="games played per count, from --seed on")
+    parser.add_argument("--play-steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'per lane':>9} {'total':>7} {'objects us':>11} {'store us':>9} {'speedup':>8}")
+    for obsCnt in args.counts:
+        objects = makeWorld(obsCnt, False, args.seed)
+        store = makeWorld(obsCnt, True, args.seed)
+
+        objectTime = timeUpdates(objects, args.frames)
+        storeTime = timeUpdates(store, args.frames)
+
+        # Both paths ran the same number of frames, so every obstacle should be in the same place
+        for objectLane, storeLane in zip(objects.lanes, store.lanes):
+            for a, b in zip(objectLane.obstacles, storeLane.obstacles):
+                assert a.pos_x == b.pos_x and a.rect == b.rect, "store drifted from Obstacle.update"
+
+        total = sum(len(lane.obstacles) for lane in objects.lanes)
+        print(
+            f"{obsCnt:>9} {total:>7} {objectTime * 1e6:>11.1f} {storeTime * 1e6:>9.1f}"
+            f" {objectTime / storeTime:>7.1f}x"
+        )
+
+    # Playing through both paths, a frog landing on two boats has to ride the same one in each
+    diverged = 0
+    for obsCnt in args.play_counts:
+        for seed in range(args.seed, args.seed + args.play_seeds):
+            tick = comparePlay(obsCnt, seed, args.play_steps)
+            if tick is not None:
+                diverged += 1
+                print(f"MISMATCH: {obsCnt} per lane, seed {seed}, store and objects differ at tick {tick}")
+    games = len(args.play_counts) * args.play_seeds
+    print(f"Played {games} games through both paths, {diverged} differed")
+    return 1 if diverged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
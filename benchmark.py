@@ -0,0 +1,296 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+from frogger_game_class import Game, Lane, Score
+from profiler import percentile
+
+"""
+    Benchmark Suite
+        - This script times the game's hot paths without a display
+            - makeLanes at levels 1 through 20, window resize and background bake included
+            - Switching to the next level when the frog reaches the finish lane, with the next level
+            prepared ahead of time and without
+            - One frame of the play loop (step, draw, present) with more and more obstacles, at full and
+            half render scale
+            - Lane.check against lanes of different sizes
+            - Score.draw_hud, with the HUD cached and with it rendered every time
+        - Each scenario reports mean and p95 time per operation, and the bytes allocated per operation
+        - Results are saved as JSON, and --compare fails the run when a scenario got slower than a
+        saved run by more than --threshold
+        - Run it with: python benchmark.py --out bench.json [--compare old.json --threshold 0.15]
+"""
+
+
+"""
+    Measure Function
+        - This function is responsible for timing one scenario
+            - setup() runs before every operation and is not timed
+            - op() is the operation being measured
+        - The allocation pass runs separately, so tracemalloc does not slow down the timings
+"""
+
+
+def measure(op, setup=None, repeat=200, warmup=20):
+    for i in range(warmup):
+        if setup is not None:
+            setup()
+        op()
+
+    times = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        op()
+        times.append(time.perf_counter() - start)
+    times.sort()
+
+    allocRepeat = max(repeat // 10, 1)
+    allocated = 0
+    tracemalloc.start()
+    for i in range(allocRepeat):
+        if setup is not None:
+            setup()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        op()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    return {
+        "mean": sum(times) / len(times) * 1e6,
+        "p95": percentile(times, 0.95) * 1e6,
+        "allocBytes": allocated / allocRepeat,
+    }
+
+
+"""
+    Make Lanes Scenarios
+        - This function is responsible for timing a level change at each level
+"""
+
+
+def benchMakeLanes(game, repeat):
+    results = {}
+    for level in range(1, 21):
+
+        def setup():
+            game.world.score.level = level
+
+        results[f"makeLanes.level{level:02d}"] = measure(game.makeLanes, setup, repeat)
+    return results
+
+
+"""
+    Level Switch Scenarios
+        - This function is responsible for timing the step that reaches the finish lane, and the resize
+        that follows it
+            - prepared lets the world and renderer finish preparing the next level first, like playing
+            the level through does
+            - cold switches straight away, so the whole level is built and baked on the spot
+"""
+
+
+def benchLevelSwitch(game, repeat):
+    world = game.world
+    renderer = game.renderer
+
+    def switch():
+        if world.step():
+            game.resize()
+
+    results = {}
+    for name in ("prepared", "cold"):
+        for level in range(2, 12):
+
+            def setup():
+                world.score.level = level - 1
+                world.frog.reset()
+                game.makeLanes()
+                if name == "prepared":
+                    while world.prepare():
+                        pass
+                    while renderer.prebake(world):
+                        pass
+                world.frog.move(0, len(world.lanes) - 1)
+
+            results[f"levelSwitch.{name}.level{level:02d}"] = measure(switch, setup, repeat)
+    return results
+
+
+"""
+    Frame Scenarios
+        - This function is responsible for timing one frame of the play loop with more and more obstacles
+        - The vectorized ObstacleStore is measured too, when NumPy is installed
+        - The objects are measured again at half render scale
+"""
+
+
+def benchFrame(game, repeat, counts):
+    world = game.world
+    renderer = game.renderer
+
+    def frame():
+        renderer.present()
+        if world.step():
+            game.resize()
+        renderer.draw(world)
+
+    # The store goes last, a world that moved its obstacles into a store cannot move them back
+    configs = [("objects", None, 1.0), ("half", None, 0.5)]
+    try:
+        from obstacle_store import ObstacleStore
+
+        configs.append(("store", ObstacleStore(screenWidth=world.width), 1.0))
+    except ImportError:
+        pass
+
+    results = {}
+    for name, store, scale in configs:
+        world.store = store
+        renderer.setScale(scale)
+        for obsCnt in counts:
+            world.obsCnt = obsCnt
+            world.score.level = 8
+            world.frog.reset()
+            game.makeLanes()
+            results[f"frame.{name}.{obsCnt}"] = measure(frame, repeat=repeat)
+
+    world.store = None
+    world.obsCnt = 1
+    renderer.setScale(1.0)
+    return results
+
+
+"""
+    Lane Check Scenarios
+        - This function is responsible for timing Lane.check against lanes of different sizes
+        - The frog is left in the middle of the lane, so every obstacle has a fair chance to be near it
+"""
+
+
+def benchCheck(game, repeat, counts):
+    frog = game.world.frog
+    score = Score()
+    results = {}
+    for type in ("car", "water"):
+        for obsCnt in counts:
+            lane = Lane(1, type, obsCnt, 1)
+            frog.reset()
+            frog.move(0, 1)
+
+            def op():
+                for i in range(100):
+                    lane.check(frog, score)
+
+            result = measure(op, repeat=repeat)
+            for key in ("mean", "p95", "allocBytes"):
+                result[key] /= 100
+            results[f"check.{type}.{obsCnt}"] = result
+    return results
+
+
+"""
+    HUD Scenarios
+        - This function is responsible for timing Score.draw_hud, cached and rendered every time
+"""
+
+
+def benchHud(game, repeat):
+    score = Score()
+    screen = game.screen
+
+    def invalidate():
+        score.hud = None
+
+    return {
+        "hud.cached": measure(lambda: score.draw_hud(screen), repeat=repeat),
+        "hud.render": measure(lambda: score.draw_hud(screen), invalidate, repeat),
+    }
+
+
+"""
+    Compare Function
+        - This function is responsible for finding the scenarios that got slower than a saved run
+        - Returns a line describing each regression
+"""
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        change = result["mean"] / old["mean"] - 1
+        if change > threshold:
+            regressions.append(f"{name}: {old['mean']:.1f} us -> {result['mean']:.1f} us ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark suite")
+    parser.add_argument("--out", default="bench.json", help="where to save the results")
+    parser.add_argument("--compare", metavar="PATH", help="saved results to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown, 0.15 is 15%%")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    game = Game(fps=0, seed=args.seed)
+    game.loadAssets(block=True)
+
+    results = {}
+    results.update(benchMakeLanes(game, args.repeat))
+    results.update(benchLevelSwitch(game, args.repeat))
+    results.update(benchFrame(game, args.repeat, args.counts))
+    results.update(benchCheck(game, args.repeat, args.counts))
+    results.update(benchHud(game, args.repeat))
+
+    print(f"{'scenario':<32} {'mean us':>10} {'p95 us':>10} {'alloc B':>10}")
+    for name, result in results.items():
+        print(f"{name:<32} {result['mean']:>10.1f} {result['p95']:>10.1f} {result['allocBytes']:>10.0f}")
+
+    with open(args.out, "w") as file:
+        json.dump(
+            {
+                "meta": {
+                    "python": platform.python_version(),
+                    "pygame": pygame.version.ver,
+                    "machine": platform.machine(),
+                    "seed": args.seed,
+                    "repeat": args.repeat,
+                },
+                "scenarios": results,
+            },
+            file,
+            indent=1,
+        )
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            status = 1
+
+    pygame.quit()
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
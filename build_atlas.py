@@ -0,0 +1,154 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import sys
+
+import pygame
+
+from assets import Atlas, ATLAS_INDEX
+from renderer import OBSTACLE_IMAGES, OBSTACLE_SIZE
+
+"""
+    Atlas Builder
+        - This script packs every sprite into one atlas for the game to memory-map at startup
+            - Every PNG in the sprites folder at its own size, and the obstacles at the size they are
+            drawn, so nothing is scaled at runtime either
+            - The sprites are packed in rows, tallest first, into an image as wide as the widest sprite
+            - The pixels are written raw, and the index next to them says where each sprite is
+        - The atlas is checked against the PNGs pixel for pixel after it is written
+        - The game goes back to the PNGs on its own when a sprite changes after the atlas was built, run
+        this again to bring it up to date
+        - The atlas is built from the PNGs next to --index, and names them relative to that folder, so a
+        copy of the sprites anywhere can be packed
+        - Run it with: python build_atlas.py
+"""
+
+# Sprites drawn at another size than their own, as (file name, size)
+SCALED = [(os.path.basename(path), OBSTACLE_SIZE) for path in OBSTACLE_IMAGES.values()]
+
+# Pixel layout of the raw file, the byte order of the usual 32-bit display format, so converting it
+# for the display is a plain copy
+FORMAT = "BGRA"
+
+
+"""
+    Sprites Function
+        - This function is responsible for decoding and scaling every sprite that goes into the atlas
+        - Returns a list of (name, size, surface), name is the file name in folder, size is None for a
+        sprite at its own size
+"""
+
+
+def sprites(folder):
+    decoded = {}
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".png"):
+            decoded[name] = pygame.image.load(os.path.join(folder, name))
+
+    result = [(name, None, surface) for name, surface in decoded.items()]
+    for name, size in SCALED:
+        result.append((name, size, pygame.transform.scale(decoded[name], size)))
+    return result
+
+
+"""
+    Pack Function
+        - This function is responsible for placing every sprite in the atlas
+        - Sprites fill rows left to right, tallest first, a new row starts when one does not fit
+        - Returns the atlas size and each sprite's rect, in the order of items
+"""
+
+
+def pack(items):
+    width = max(surface.get_width() for name, size, surface in items)
+    order = sorted(range(len(items)), key=lambda i: (-items[i][2].get_height(), -items[i][2].get_width()))
+
+    rects = [None] * len(items)
+    x = y = rowHeight = 0
+    for i in order:
+        w, h = items[i][2].get_size()
+        if x + w > width:
+            x = 0
+            y += rowHeight
+            rowHeight = 0
+        rects[i] = pygame.Rect(x, y, w, h)
+        x += w
+        rowHeight = max(rowHeight, h)
+    return (width, y + rowHeight), rects
+
+
+"""
+    Check Function
+        - This function is responsible for making sure every sprite reads back from the atlas exactly as
+        it was packed
+        - Returns the sprites that do not match
+"""
+
+
+def check(indexPath, items):
+    atlas = Atlas(indexPath)
+    folder = os.path.dirname(indexPath)
+    wrong = []
+    for name, size, surface in items:
+        packed = atlas.pixels(os.path.join(folder, name), size)
+        if packed is None or pygame.image.tobytes(packed, FORMAT) != pygame.image.tobytes(surface, FORMAT):
+            wrong.append((name, size))
+    return wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack every sprite into a memory-mappable atlas")
+    parser.add_argument("--index", default=ATLAS_INDEX, help="where to write the index, the pixels go next to it")
+    args = parser.parse_args()
+
+    pygame.init()
+    folder = os.path.dirname(args.index)
+    items = sprites(folder)
+    size, rects = pack(items)
+
+    # Sprites are copied onto a surface with per-pixel alpha, whatever format their PNG was
+    atlas = pygame.Surface(size, pygame.SRCALPHA, 32)
+    atlas.fill((0, 0, 0, 0))
+    for (name, spriteSize, surface), rect in zip(items, rects):
+        atlas.blit(surface, rect)
+
+    pixels = os.path.splitext(os.path.basename(args.index))[0] + ".raw"
+    with open(os.path.join(folder, pixels), "wb") as file:
+        file.write(pygame.image.tobytes(atlas, FORMAT))
+
+    sources = {
+        name: os.stat(os.path.join(folder, name)).st_mtime_ns
+        for name, spriteSize, surface in items
+        if spriteSize is None
+    }
+    index = {
+        "size": list(size),
+        "format": FORMAT,
+        "pixels": pixels,
+        "sources": sources,
+        "sprites": [
+            {"path": name, "size": list(spriteSize) if spriteSize is not None else None, "rect": list(rect)}
+            for (name, spriteSize, surface), rect in zip(items, rects)
+        ],
+    }
+    with open(args.index, "w") as file:
+        json.dump(index, file, indent=1)
+
+    wrong = check(args.index, items)
+    for name, spriteSize in wrong:
+        print(f"MISMATCH: {name} at {spriteSize or 'its own size'} reads back differently from the atlas")
+
+    used = sum(rect.width * rect.height for rect in rects)
+    print(
+        f"Packed {len(items)} sprites into {size[0]}x{size[1]}, {size[0] * size[1] * 4 / 1e6:.1f} MB,"
+        f" {used / (size[0] * size[1]):.0%} used"
+    )
+    pygame.quit()
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
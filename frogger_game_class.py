@@ -1,6 +1,67 @@
+import time
+
+# Taken before pygame is imported, so startup is measured from as close to launch as the game can get
+STARTED = time.perf_counter()
+
 import pygame, sys
+import argparse
 import random
 
+from assets import assets, AssetLoader, FONT
+from lane_index import LaneIndex
+from pool import Pool
+from profiler import FrameProfiler, ProfilerOverlay, LatencyMeter, LatencyBot, percentile
+from renderer import (
+    Renderer,
+    lerp,
+    OBSTACLE_IMAGES,
+    OBSTACLE_SIZE,
+    POTHOLE_IMAGE,
+    FROG_IMAGE,
+    HUD_POSITION,
+    LAYER_POTHOLES,
+    LAYER_OBSTACLES,
+    LAYER_FROG,
+)
+from replay import InputRecorder, MAX_SEED, MAX_SIM_HZ
+from telemetry import TelemetryWriter
+
+# Collision box sizes, matching the sprites the renderer draws with their top left corner at the
+# position, obstacles use the renderer's OBSTACLE_SIZE, the size their sprites are scaled to
+POTHOLE_SIZE = (64, 64)
+FROG_SIZE = (64, 64)
+
+# Obstacle speeds were tuned in pixels per frame at 30 FPS, they are stored in pixels per second
+SPEED_SCALE = 30
+
+# Difficulty, the chance a lane of levels 1 to 8 is a car lane rather than water, in steps of 0.1,
+# and how many levels apart the faster levels are
+CAR_CHANCE = 0.5
+SPEED_RAMP = 5
+
+# Inputs understood by World.step, and how far each one moves the frog
+MOVES = {"left": (-1, 0), "right": (1, 0), "up": (0, -1), "down": (0, 1)}
+
+# Seconds of frames each frame time summary in the telemetry covers
+FRAME_SUMMARY_SECONDS = 5
+
+"""
+    Offset Bounds Function
+        - This function is responsible for working out the offsets (dx, dy) of one sprite from another at
+        which their mask boxes overlap
+        - Returns (left, right, top, bottom), the boxes overlap when left < dx < right and top < dy < bottom
+"""
+
+
+def offsetBounds(box, otherBox):
+    return (
+        box.left - otherBox.right,
+        box.right - otherBox.left,
+        box.top - otherBox.bottom,
+        box.bottom - otherBox.top,
+    )
+
+
 """
     Score Class
         - This class is responsible for keeping track of...
@@ -12,31 +73,49 @@ import random
 
 
 class Score(pygame.sprite.Sprite):
-    def __init__(self, screen):
+    def __init__(self):
         super().__init__()
         # self.pos_x = pos_x
         # self.pos_y = pos_y
         self.level = 1
         self.lives = 5
         self.gameover = False
+        self.hud = None
+        # What took the last life, "car", "pothole" or "water"
+        self.lastCause = None
+
+    """
+        HUD Surface Function
+            - This function is responsible for the text showing the number of lives remaining, as well as
+            the current level
+            - The text is only rendered again after the lives or the level changed
+    """
+
+    def hudSurface(self):
+        if self.hud is None:
+            font = assets.font(FONT, 24)
+            self.hud = assets.render(font, f"Lives: {self.lives} Level: {self.level}")
+        return self.hud
 
     """
         Draw the HUD
             - This function is responsible for display the number of lives remaining, as well as the current level
+            - Returns the rect of the screen that was drawn on
     """
 
     def draw_hud(self, screen):
-        font = pygame.font.Font("sprites/Oswald-Regular.ttf", 24)
-        text = font.render(f"Lives: {self.lives} Level: {self.level}", True, (0, 0, 0))
-        screen.blit(text, (1000, 32))
+        return screen.blit(self.hudSurface(), HUD_POSITION)
 
     """
         Remove life function
             - removes a life from the starting amount whenever a collison occurs
+            - cause is what the frog ran into, kept in lastCause for the world's telemetry
     """
 
-    def remove_life(self):
+    def remove_life(self, cause=None):
         self.lives -= 1
+        self.hud = None
+        self.lastCause = cause
 
         # Triggering the gameover flag once the lives reach 0
         if self.lives <= 0:
@@ -49,6 +128,7 @@ class Score(pygame.sprite.Sprite):
 
     def advance_level(self):
         self.level += 1
+        self.hud = None
 
     """
         Check for Gameover
@@ -64,186 +144,293 @@ class Score(pygame.sprite.Sprite):
 """
     Obstacle Class
         - This class is responsible for keeping track of
-            - The obstacles' position
-            - The obstacles' velocity
-            - The obstacles' collision with the character
-        - This class is responsible for drawing
-            - The obstacles in the lanes
+            - The obstacles' position, and where it was before the last update
+            - The obstacles' velocity, in pixels per second
+            - The obstacles' collision box
+        - Drawing the obstacles is left to the Renderer, drawItems() tells it what to draw
+        - Obstacles are reused across levels through a Pool, reinit() sets one up again in place
 """
 
 
-class Obstacle(pygame.sprite.Sprite):
-    def __init__(self, pos_y, type, level):
-        super().__init__()
-        directionChooser = random.randrange(0, 10)
-        self.pos_x = random.randrange(0, 1280)
+class Obstacle:
+    __slots__ = (
+        "pos_x",
+        "pos_y",
+        "prev_x",
+        "pothole_x",
+        "pothole_y",
+        "level",
+        "potHoleFlag",
+        "type",
+        "velocity",
+        "width",
+        "rect",
+        "rect2",
+        "potholeRect",
+    )
+
+    def __init__(self, pos_y, type, level, rng=random, speedRamp=SPEED_RAMP):
+        self.rect = pygame.Rect((0, 0), OBSTACLE_SIZE)
+        self.potholeRect = pygame.Rect((0, 0), POTHOLE_SIZE)
+        self.reinit(pos_y, type, level, rng, speedRamp)
+
+    """
+        Reinit Function
+            - This function is responsible for giving the obstacle a new random position, direction, speed
+            and pothole
+            - Every speedRamp levels, the obstacles of that one level are faster
+            - The obstacle's rects are reused, so a pooled obstacle allocates nothing
+    """
+
+    def reinit(self, pos_y, type, level, rng=random, speedRamp=SPEED_RAMP):
+        directionChooser = rng.randrange(0, 10)
+        self.pos_x = rng.randrange(0, 1280)
         self.pos_y = pos_y
         self.pothole_x = self.pos_x
         self.pothole_y = pos_y + 32
         self.level = level
-        self.potHoleFlag = random.randrange(0, 10)
+        self.potHoleFlag = rng.randrange(0, 10)
         self.type = type
 
-        if self.level % 5 == 0:
-            spdMultiplier = self.level / 5 + 1
+        if self.level % speedRamp == 0:
+            spdMultiplier = self.level / speedRamp + 1
         else:
             spdMultiplier = 1
 
         if directionChooser < 5:
-            self.velocity = spdMultiplier * (random.randrange(-5, -1))
+            self.velocity = spdMultiplier * (rng.randrange(-5, -1)) * SPEED_SCALE
         elif directionChooser >= 5:
-            self.velocity = spdMultiplier * (random.randrange(1, 5))
+            self.velocity = spdMultiplier * (rng.randrange(1, 5)) * SPEED_SCALE
         self.width = 256
+        self.prev_x = self.pos_x
 
-        if type == "car":
-            self.image = pygame.image.load("sprites/qline.png")
-            self.image = pygame.transform.scale(self.image, (120, 120))
-            self.rect = self.image.get_rect()
-            self.rect2 = None
-            if self.potHoleFlag < 7:
-                self.image2 = pygame.image.load("sprites/pothole.png")
-                self.rect2 = self.image2.get_rect()
-                self.rect2.center = [self.pos_x, self.pos_y]
-        elif type == "water":
-            self.rect2 = None
-            self.image = pygame.image.load("sprites/boat.png")
-            self.image = pygame.transform.scale(self.image, (120, 120))
-            self.rect = self.image.get_rect()
-        self.rect.center = [self.pos_x, self.pos_y]
+        self.rect2 = None
+        if type == "car" and self.potHoleFlag < 7:
+            self.rect2 = self.potholeRect
+            self.rect2.topleft = [self.pothole_x, self.pothole_y]
+        self.rect.topleft = [self.pos_x, self.pos_y]
 
     """
         Update Obstacles
             - This is the function we call to update the position of an obstacle based on its velocity
+            - dt is the length of the simulation step, in seconds
             - This function also handles the obstacles running off the screen
+            - Potholes stay where they were made, only the obstacle's rect moves
     """
 
-    def update(self, screen):
+    def update(self, dt):
         # Updating the position based on the set velocity
-        self.pos_x += self.velocity
+        self.prev_x = self.pos_x
+        self.pos_x += self.velocity * dt
 
         # Checking to see when it hits the edge of the screen, then restarting on other side
         if self.velocity > 0 and self.pos_x > 1280 + 64:
             self.pos_x = -self.width
+            self.prev_x = self.pos_x
         elif self.velocity < 0 and self.pos_x < -self.width:
             self.pos_x = 1280
+            self.prev_x = self.pos_x
 
-        self.rect.center = [self.pos_x, self.pos_y]
+        self.rect.topleft = [self.pos_x, self.pos_y]
 
-        screen.blit(self.image, (self.pos_x, self.pos_y))
+    """
+        Draw Items Function
+            - This function is responsible for telling the Renderer what to draw for the obstacle
+            - Adds (kind, x, y) items to the layers, the obstacle alpha of the way from its previous
+            position and its pothole where it was made
+    """
 
-        if self.potHoleFlag < 7 and self.type == "car":
-            self.rect2.center = [self.pothole_x, self.pothole_x]
-            screen.blit(self.image2, (self.pothole_x, self.pothole_y))
+    def drawItems(self, alpha, layers):
+        layers[LAYER_OBSTACLES].append((self.type, lerp(self.prev_x, self.pos_x, alpha), self.pos_y))
+        if self.rect2 is not None:
+            layers[LAYER_POTHOLES].append(("pothole", self.pothole_x, self.pothole_y))
 
 
 """
     Lane Class
         - This class is responsible for keeping track of
             - The position of the lane
-            - THe obstacles in the lane
+            - THe obstacles in the lane, and a LaneIndex of them sorted by x
             - The type of the lane
-        - This class is responsible for drawing
-            - The lane itself
-            - Calling the draw method on the obstacles
+        - Drawing the lane and its obstacles is left to the Renderer, drawItems() tells it what to draw
+        - Lanes are reused across levels through a Pool, reinit() sets one up again in place
 """
 
 
-class Lane(pygame.sprite.Sprite):
-    def __init__(self, pos, type="safe", obsCnt=0, level=1):
-        super().__init__()
+class Lane:
+    __slots__ = (
+        "pos_x",
+        "pos_y",
+        "width",
+        "height",
+        "type",
+        "obsCnt",
+        "obstacles",
+        "level",
+        "index",
+        "rect",
+        "mask",
+        "bounds",
+        "potholeRects",
+        "potholeMask",
+        "potholeBounds",
+    )
+
+    def __init__(self, pos, type="safe", obsCnt=0, level=1, rng=random, pool=None, speedRamp=SPEED_RAMP):
+        self.obstacles = []
+        self.index = LaneIndex()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.potholeRects = []
+        self.potholeMask = assets.mask(POTHOLE_IMAGE)
+        self.potholeBounds = offsetBounds(assets.maskBox(FROG_IMAGE), assets.maskBox(POTHOLE_IMAGE))
+        self.reinit(pos, type, obsCnt, level, rng, pool, speedRamp)
+
+    """
+        Reinit Function
+            - This function is responsible for setting the lane up as a new lane
+            - The obstacles come from pool when one is given, and the lane's list, index and rect are
+            reused, so a pooled lane allocates nothing
+    """
+
+    def reinit(self, pos, type="safe", obsCnt=0, level=1, rng=random, pool=None, speedRamp=SPEED_RAMP):
         self.pos_x = 0
         self.pos_y = pos * 128
         self.width = 1280
         self.height = 128
         self.type = type
         self.obsCnt = obsCnt
-        self.obstacles = []
+        self.obstacles.clear()
         self.level = level
 
         # Check if we need obstacles, because start and finish don't have obstacles
         if self.obsCnt > 0:
             for i in range(obsCnt):
-                self.obstacles.append(Obstacle((pos * 128), self.type, self.level))
+                if pool is not None:
+                    self.obstacles.append(pool.acquire((pos * 128), self.type, self.level, rng, speedRamp))
+                else:
+                    self.obstacles.append(Obstacle((pos * 128), self.type, self.level, rng, speedRamp))
+        self.index.reset(self.obstacles)
+        self.potholeRects.clear()
+        for obstacle in self.obstacles:
+            if obstacle.rect2 is not None:
+                self.potholeRects.append(obstacle.rect2)
 
-        # Drawing lane based on type of lane we need
+        self.mask = None
+        self.bounds = None
+        if type in OBSTACLE_IMAGES:
+            self.mask = assets.mask(OBSTACLE_IMAGES[type], OBSTACLE_SIZE)
+            box = assets.maskBox(OBSTACLE_IMAGES[type], OBSTACLE_SIZE)
+            self.bounds = offsetBounds(assets.maskBox(FROG_IMAGE), box)
 
-        if self.type == "car":
-            self.image = pygame.image.load("sprites/road.png")
-            self.rect = self.image.get_rect()
-            self.rect.topleft = [self.pos_x, self.pos_y]
-        elif self.type == "water":
-            self.image = pygame.image.load("sprites/water.png")
-            self.rect = self.image.get_rect()
-            self.rect.topleft = [self.pos_x, self.pos_y]
-        elif self.type == "safe":
-            self.image = pygame.image.load("sprites/bedroom.png")
-            self.rect = self.image.get_rect()
-            self.rect.topleft = [self.pos_x, self.pos_y]
+        self.rect.update(self.pos_x, self.pos_y, self.width, self.height)
 
-        elif self.type == "finish":
-            self.image = pygame.image.load("sprites/gm_background.png")
-            self.rect = self.image.get_rect()
-            self.rect.topleft = [self.pos_x, self.pos_y]
+    """
+        Release Function
+            - This function is responsible for handing the lane's obstacles back to pool
+    """
+
+    def release(self, pool):
+        for obstacle in self.obstacles:
+            pool.release(obstacle)
+        self.obstacles.clear()
+        self.index.reset(self.obstacles)
+        self.potholeRects.clear()
 
     """
         Obstacle Position Updating
             - This function is responsible for updating the position of the obstacles as they move
     """
 
-    def update(self, screen):
+    def update(self, dt):
         for obstacle in self.obstacles:
-            obstacle.update(screen)
+            obstacle.update(dt)
+        self.index.update()
 
     """
-        Obstacle Drawing
-            - This function is responsible for drawing the obstacles in the lane
-            - Calls each Obstacle's draw() method in order to do this task
+        Draw Items Function
+            - This function is responsible for telling the Renderer what to draw for the lane's obstacles
+            - The lane itself is part of the baked background
     """
 
-    def draw(self, screen):
+    def drawItems(self, alpha, layers):
         for obstacle in self.obstacles:
-            obstacle.draw(self.image)
+            obstacle.drawItems(alpha, layers)
 
     """
         Collision Checker
             - This function is responsible for detecting when the frog collides with an obstacle,
             as well as when the frog ends up in the finish lane
             - This function resets the frog to the initial position when it collides with an obstacle
+            or a pothole
             - This function also deals with the finish condition
+            - Only the obstacles the lane's index finds near the frog's x-range are checked, unless
+            obstacles already narrows the check down
+            - Rects are compared first, then the boxes around the sprites' set pixels, and the masks are
+            only compared when those overlap, so the frog is only hit by, or carried by, the pixels that
+            are actually drawn
+            - The frog is detached from its boat by World.step before the lanes are checked
     """
 
-    def check(self, frog, score):
+    def check(self, frog, score, obstacles=None):
         finish_flag = False
         attach_flag = False
-        frog.attach(None)
+        hit_flag = False
 
         # Checking to see if the frog is in the finish lane
         if self.type == "finish":
             finish_flag = True
 
-        # Getting the frog's rect boundary object
+        # Getting the frog's rect boundary object, and its mask
         rect1 = frog.rect
+        mask1 = frog.mask
+        x1 = rect1.x
+        y1 = rect1.y
+
+        if obstacles is None:
+            obstacles = self.index.overlapping(rect1.left, rect1.right)
+
+        # The frog rides the last boat it lands on, so boats are checked from the last one back
+        if self.type == "water":
+            obstacles = reversed(obstacles)
 
         # Collision Detection
-        for obstacle in self.obstacles:
-            # if obstacle.rect2 != None:
-            #     if rect1.colliderect(obstacle.rect2):
-            #         frog.reset()
-            #         score.remove_life()
+        if self.bounds is not None:
+            left, right, top, bottom = self.bounds
+        for obstacle in obstacles:
             # Checking for collision between frog and obstacles
-            if rect1.colliderect(obstacle.rect):
+            rect = obstacle.rect
+            dx = rect.x - x1
+            dy = rect.y - y1
+            if left < dx < right and top < dy < bottom and mask1.overlap(self.mask, (dx, dy)):
                 # If we collide with a car, we reset the frog to the start
                 if self.type == "car":
-                    frog.reset()
-                    score.remove_life()
+                    hit_flag = "car"
+                    break
                 # If we collide with a boat, attach the frog to the boat
                 if self.type == "water":
                     attach_flag = True
                     frog.attach(obstacle)
-            # If do not collide with the boat, and end up in a water lane, reset the frog to the start
-            elif not attach_flag and self.type == "water":
-                frog.reset()
-                score.remove_life()
+                    break
+
+        # Checking for collision between frog and potholes, which never move
+        if not hit_flag and self.potholeRects:
+            left, right, top, bottom = self.potholeBounds
+            for i in rect1.collidelistall(self.potholeRects):
+                rect = self.potholeRects[i]
+                dx = rect.x - x1
+                dy = rect.y - y1
+                if left < dx < right and top < dy < bottom and mask1.overlap(self.potholeMask, (dx, dy)):
+                    hit_flag = "pothole"
+                    break
+
+        if hit_flag:
+            frog.reset()
+            score.remove_life(hit_flag)
+
+        # If we did not land on a boat, and end up in a water lane, reset the frog to the start
+        if not attach_flag and self.type == "water":
+            frog.reset()
+            score.remove_life("water")
 
         # Return the result of the collision check
         return finish_flag
@@ -252,35 +439,46 @@ class Lane(pygame.sprite.Sprite):
 """
     Frog Class
         - This class is responsible for keeping track of...
-            - The position of the frog
+            - The position of the frog, and where it was before the last update
             - If the frog is attached to a boat
-        - This class is responsible for drawing...
-            - The character in its current position by calling the update method
+        - Drawing the character is left to the Renderer, drawItems() tells it what to draw
+        - The collision mask is only fetched the first time it is needed, so a frog made while the
+        AssetLoader is still running does not decode its sprite on the main thread
 """
 
 
-class Frog(pygame.sprite.Sprite):
+class Frog:
     def __init__(self, pos_x, pos_y):
-        super().__init__()
         self.pos_x_init = pos_x
         self.pos_y_init = pos_y
         self.pos_x = pos_x
         self.pos_y = pos_y
+        self.prev_x = pos_x
+        self.prev_y = pos_y
         self.attached = None
 
-        self.image = pygame.image.load("sprites/student.png")
-        self.rect = self.image.get_rect()
-        self.rect.center = [self.pos_x, self.pos_y]
+        self.rect = pygame.Rect((0, 0), FROG_SIZE)
+        self.rect.topleft = [self.pos_x, self.pos_y]
+        self._mask = None
+
+    @property
+    def mask(self):
+        if self._mask is None:
+            self._mask = assets.mask(FROG_IMAGE)
+        return self._mask
 
     """
         Move Function
             - This function is responsible for moving the frog
+            - Hops are not smoothed, the frog is drawn at its new position straight away
     """
 
     def move(self, delta_x, delta_y):
         self.pos_x += delta_x * 128
         self.pos_y += delta_y * 128
-        self.rect.center = [self.pos_x, self.pos_y]
+        self.prev_x = self.pos_x
+        self.prev_y = self.pos_y
+        self.rect.topleft = [self.pos_x, self.pos_y]
 
     """
         Attach Function
@@ -299,18 +497,23 @@ class Frog(pygame.sprite.Sprite):
     def reset(self):
         self.pos_x = self.pos_x_init
         self.pos_y = self.pos_y_init
+        self.prev_x = self.pos_x
+        self.prev_y = self.pos_y
         self.attach(None)
 
     """
         Update Function
             - This function is responsible for updating the position of the character
             - This function also takes care of when the character tries to run off of the screen
-            - This function also takes care of re-drawing the character on the screen
+            - dt is the length of the simulation step, in seconds
     """
 
-    def update(self, screen, screenHeight):
+    def update(self, screenHeight, dt):
+        self.prev_x = self.pos_x
+        self.prev_y = self.pos_y
+
         if self.attached:
-            self.pos_x += self.attached.velocity
+            self.pos_x += self.attached.velocity * dt
 
         if self.pos_x + 16 > 1280:
             self.pos_x = 1280 - 16
@@ -319,228 +522,981 @@ class Frog(pygame.sprite.Sprite):
             self.pos_x = 0
 
         if self.pos_y + 16 > screenHeight:
-            self.pos_y = 720 - 16
+            self.pos_y = screenHeight - 16
 
         if self.pos_y < 0:
             self.pos_y = 32
 
-        self.rect.center = [self.pos_x, self.pos_y]
-        screen.blit(self.image, (self.pos_x, self.pos_y))
+        self.rect.topleft = [self.pos_x, self.pos_y]
+
+    """
+        Draw Items Function
+            - This function is responsible for telling the Renderer where to draw the character, alpha of
+            the way from its previous position
+    """
+
+    def drawItems(self, alpha, layers):
+        x = lerp(self.prev_x, self.pos_x, alpha)
+        y = lerp(self.prev_y, self.pos_y, alpha)
+        layers[LAYER_FROG].append(("frog", x, y))
 
 
 """
-    Gameplay Class
-        - This class is responsible for...
-            - Displaying the start screen
-            - Creating the lanes based on the current level
-            - Creating the initial score object
-            - Displaying the gameover screen
+    World Class
+        - This class is responsible for keeping track of...
+            - The lanes and their obstacles
+            - The frog
+            - The score
+            - The size of the playfield, which is never shorter than the height it started with
+        - This class never touches the display, so it can be stepped headless as fast as the CPU allows
+        - obsCnt sets how many obstacles each car and water lane gets
+        - vectorized keeps the obstacles in an ObstacleStore instead of updating them one at a time,
+        which needs NumPy
+        - Every step advances the world by the same fixed amount of time, 1 / simHz seconds
+        - All randomness comes from the world's own random.Random, so a world built with the same seed
+        and fed the same inputs on the same ticks always plays out the same way
+        - tick counts the steps taken since the world was created, restarts included
+        - carChance and speedRamp set the difficulty, see CAR_CHANCE and SPEED_RAMP
+        - The next level is built a lane per step while the current one is played, always in the same
+        order, so it draws from the random.Random at the same points in every run
+        - Telemetry events are emitted from the simulation, so their ticks are the same however fast the
+        world is stepped
 """
 
 
-class Game:
-    def __init__(self):
-        pygame.init()
-        self.clock = pygame.time.Clock()
-        self.lanes = pygame.sprite.Group()
-        self.frog = None
-        self.screen_width = 1280
-        self.screen_height = 720
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
-        pygame.display.set_caption("Interview Rush")
-        self.score = Score(self.screen)
-
-        pygame.key.set_repeat(0, 0)
+class World:
+    def __init__(
+        self,
+        width=1280,
+        height=720,
+        obsCnt=1,
+        vectorized=False,
+        simHz=30,
+        seed=None,
+        carChance=CAR_CHANCE,
+        speedRamp=SPEED_RAMP,
+    ):
+        self.seed = seed
+        self.carChance = carChance
+        self.speedRamp = speedRamp
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.simHz = simHz
+        self.dt = 1 / simHz
+        self.width = width
+        self.height = height
+        self.minHeight = height
+        self.obsCnt = obsCnt
+        self.score = Score()
         self.frog = Frog(640, 56)
+        self.lanes = []
+
+        # Lanes and obstacles of finished levels, handed out again when new ones are made
+        self.lanePool = Pool(Lane)
+        self.obstaclePool = Pool(Obstacle)
+
+        # Lanes of the level after this one, built a lane at a time by prepare()
+        self.nextLevel = None
+        self.nextLanes = []
+        self.pending = None
+
+        # Optional FrameProfiler, the step charges its work to the profiler's phases when it is set
+        self.profiler = None
+
+        # Optional TelemetryWriter, told about games, levels and deaths as they happen when it is set
+        self.telemetry = None
+        self.games = 0
+        self.levelStart = 0
+
+        self.store = None
+        if vectorized:
+            from obstacle_store import ObstacleStore
+
+            self.store = ObstacleStore(screenWidth=width)
 
     """
-        Draw Lanes Function
-            - This function is responsible for drawing the lanes based on the current level
-            - This function "randomizes" the type of lane to be drawn
+        Generate Lanes Function
+            - This function is responsible for creating the lanes for a level, one lane at a time
+            - This function "randomizes" the type of lane to be created
+            - The lanes are appended to lanes, and the function yields after each one, so a level can be
+            built all at once or spread across many steps
     """
 
-    def makeLanes(self):
-        laneCount = self.score.level
+    def generateLanes(self, level, lanes):
+        laneCount = level
         counter = 1
 
-        self.screen.fill((0, 0, 0))
-        self.lanes.empty()
-        self.lanes.add(Lane(0, "safe"))
+        lanes.append(self.acquireLane(0, "safe"))
+        yield
 
         if laneCount <= 8:
             for i in range(0, laneCount):
-                laneDecider = random.randrange(0, 10)
+                laneDecider = self.rng.randrange(0, 10)
 
-                if counter >= 4 and counter < 9:
-                    self.screen_height += 64
-                    self.screen = pygame.display.set_mode(
-                        (self.screen_width, self.screen_height)
-                    )
                 # Deciding between water and car lane
-                if laneDecider < 5:
-                    self.lanes.add(Lane(counter, "car", 1, self.score.level))
-                elif laneDecider >= 5:
-                    self.lanes.add(Lane(counter, "water", 1, self.score.level))
+                if laneDecider < self.carChance * 10:
+                    laneType = "car"
+                else:
+                    laneType = "water"
+                lanes.append(self.acquireLane(counter, laneType, self.obsCnt, level))
 
                 counter += 1
+                yield
 
-            self.lanes.add(Lane(counter, "finish"))
+            lanes.append(self.acquireLane(counter, "finish"))
         else:
             for i in range(0, 9):
-                if counter >= 4 and counter < 9:
-                    self.screen_height += 64
-                    self.screen = pygame.display.set_mode(
-                        (self.screen_width, self.screen_height)
-                    )
-                self.lanes.add(Lane(counter, "car", 1))
+                lanes.append(self.acquireLane(counter, "car", self.obsCnt))
                 counter += 1
+                yield
+
+            lanes.append(self.acquireLane(counter, "finish"))
+
+    """
+        Acquire Lane Function
+            - This function is responsible for getting a lane set up from the pool, with the world's
+            random.Random and difficulty
+    """
 
-            self.lanes.add(Lane(counter, "finish"))
+    def acquireLane(self, pos, type, obsCnt=0, level=1):
+        return self.lanePool.acquire(pos, type, obsCnt, level, self.rng, self.obstaclePool, self.speedRamp)
 
     """
-        Game Over Function
-            - This function is responsible for displaying the game over screen, and allowing the player to 
+        Field Height Function
+            - This function is responsible for working out how tall the playfield is for a set of lanes
+            - The playfield is never shorter than the height the world started with
     """
 
-    def gameOver(self):
-        self.screen.fill((202, 204, 207))
+    def fieldHeight(self, lanes):
+        return max(self.minHeight, len(lanes) * 128)
 
-        font = pygame.font.Font("sprites/Oswald-Regular.ttf", 24)
-        text = font.render("Game Over!", True, (0, 0, 0))
+    """
+        Make Lanes Function
+            - This function is responsible for creating the lanes for the current level straight away
+            - Used when a game starts, or when the level was changed from outside the world
+    """
 
-        restartText = font.render(
-            "[R] to restart the game               [E] to exit", True, (0, 0, 0)
-        )
+    def makeLanes(self):
+        # Whatever was prepared for the next level is no longer needed
+        self.pending = None
+        self.releaseLanes(self.nextLanes)
+        self.nextLanes.clear()
 
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                    self.score = Score(self.screen)
-                    self.makeLanes()
-                    self.startUp()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
-                    pygame.quit()
-                    sys.exit()
-
-            self.screen.blit(text, (500, 32))
-            self.screen.blit(restartText, (500, 300))
-            pygame.display.flip()
-            self.clock.tick(30)
-
-    """
-        Intro Function
-            - This function is responsible for drawing the intro screen
-    """
-
-    def intro(self):
-        self.screen.fill((202, 204, 207))
-
-        font = pygame.font.Font("sprites/Oswald-Regular.ttf", 24)
-        text = font.render("Welcome to Interview Rush!", True, (0, 0, 0))
-        text2 = font.render(
-            "The goal of this game is to get to as many interviews as possible",
-            True,
-            (0, 0, 0),
-        )
-        text3 = font.render(
-            "by dodging the Q-Line and hopping on boats to get to the GM Building",
-            True,
-            (0, 0, 0),
-        )
-        qlineText = font.render(
-            ": Dodge these, when hit you will lose a life", True, (0, 0, 0)
-        )
-        boatText = font.render(
-            ": Ride on these to get across the water", True, (0, 0, 0)
+        lanes = []
+        for i in self.generateLanes(self.score.level, lanes):
+            pass
+        self.install(lanes)
+
+    """
+        Install Function
+            - This function is responsible for making a set of lanes the current level
+            - This function also sizes the playfield to fit the level's lanes
+            - This function also starts preparing the level after this one, step() builds one of its lanes
+            per simulation step, so reaching the finish lane only has to swap the prepared lanes in
+            - This function is where every level starts, for the telemetry
+    """
+
+    def install(self, lanes):
+        self.releaseLanes(self.lanes, views=self.store is not None)
+        self.lanes = lanes
+        self.height = self.fieldHeight(lanes)
+        self.levelStart = self.tick
+        if self.telemetry is not None:
+            self.telemetry.emit(
+                "level.start", level=self.score.level, tick=self.tick, lanes=[lane.type for lane in lanes]
+            )
+
+        # Moving the new obstacles into the store, the lanes keep views of them
+        if self.store is not None:
+            self.store.clear()
+            for index, lane in enumerate(self.lanes):
+                views = [self.store.add(obstacle, index) for obstacle in lane.obstacles]
+                lane.release(self.obstaclePool)
+                lane.obstacles.extend(views)
+                lane.index.follow(self.store, index)
+                lane.potholeRects.clear()
+                for view in views:
+                    rect2 = view.rect2
+                    if rect2 is not None:
+                        lane.potholeRects.append(rect2)
+
+        self.nextLevel = self.score.level + 1
+        self.nextLanes = []
+        self.pending = self.generateLanes(self.nextLevel, self.nextLanes)
+
+    """
+        Release Lanes Function
+            - This function is responsible for handing lanes that are no longer used back to the pools
+            - views says the lanes were installed in vectorized mode, they only hold views, their obstacles
+            went back to the pool when they were copied into the store
+            - Lanes prepared for the next level still hold their obstacles until they are installed, so
+            those always go back to the pool
+    """
+
+    def releaseLanes(self, lanes, views=False):
+        for lane in lanes:
+            if views:
+                lane.obstacles.clear()
+            lane.release(self.obstaclePool)
+            self.lanePool.release(lane)
+
+    """
+        Prepare Function
+            - This function is responsible for building one more lane of the next level
+            - Returns True while there are lanes left to build
+    """
+
+    def prepare(self):
+        if self.pending is None:
+            return False
+        if next(self.pending, StopIteration) is StopIteration:
+            self.pending = None
+            return False
+        return True
+
+    """
+        Start Next Level Function
+            - This function is responsible for swapping in the lanes prepared for the current level
+            - Whatever is left of the preparation is finished first, so the outcome never depends on how
+            far it got
+    """
+
+    def startNextLevel(self):
+        if self.nextLevel != self.score.level:
+            self.makeLanes()
+            return
+
+        while self.prepare():
+            pass
+        self.install(self.nextLanes)
+
+    """
+        Reset Function
+            - This function is responsible for starting a fresh game with a new score and new lanes
+            - Every game after the first is a restart, for the telemetry
+    """
+
+    def reset(self):
+        self.games += 1
+        if self.telemetry is not None:
+            self.telemetry.emit(
+                "game.start", game=self.games, restart=self.games > 1, seed=self.seed, simHz=self.simHz, tick=self.tick
+            )
+        self.score = Score()
+        self.frog.reset()
+        self.makeLanes()
+
+    """
+        Draw Items Function
+            - This function is responsible for telling the Renderer what to draw, as (kind, x, y) items
+            added to its list for each layer
+            - alpha is how far the display is between the last two simulation steps
+    """
+
+    def drawItems(self, alpha, layers):
+        if self.store is not None:
+            self.store.drawItems(alpha, layers)
+        else:
+            for lane in self.lanes:
+                lane.drawItems(alpha, layers)
+        self.frog.drawItems(alpha, layers)
+
+    """
+        Apply Inputs Function
+            - This function is responsible for moving the frog straight away, ahead of the next step
+            - Moves applied here count as that step's inputs, so step() plays out exactly as if they had
+            been passed to it, and a recording of them replays the same way
+            - The frog is only kept on the playfield by the step, until then it is drawn wherever it hopped
+    """
+
+    def applyInputs(self, inputs):
+        for move in inputs:
+            self.frog.move(*MOVES[move])
+
+    """
+        Step Function
+            - This function is responsible for advancing the game by one fixed simulation step
+            - inputs is a list of moves from MOVES, applied before anything else moves
+            - Returns True when the frog reached the finish lane and a new level was made
+    """
+
+    def step(self, inputs=()):
+        profiler = self.profiler
+        self.tick += 1
+        self.applyInputs(inputs)
+
+        # Updating the obstacles in every lane
+        if self.store is not None:
+            self.store.update(self.dt)
+        else:
+            for lane in self.lanes:
+                lane.update(self.dt)
+        if profiler is not None:
+            profiler.mark("lanes.update")
+
+        # Updating the frog's position
+        self.frog.update(self.height, self.dt)
+        if profiler is not None:
+            profiler.mark("frog.update")
+
+        # Checking every lane the frog's rect overlaps, worked out from its top and bottom edges
+        rect = self.frog.rect
+        first = max(rect.top // 128, 0)
+        last = min((rect.bottom - 1) // 128, len(self.lanes) - 1)
+
+        self.frog.attach(None)
+        lives = self.score.lives
+        collision = False
+        for lane in range(first, last + 1):
+            if self.store is not None:
+                nearby = self.store.colliding(lane, rect)
+                collision = self.lanes[lane].check(self.frog, self.score, nearby) or collision
+            else:
+                collision = self.lanes[lane].check(self.frog, self.score) or collision
+
+            # Once the frog has been sent back to the start, the other lanes no longer matter
+            if self.score.lives != lives:
+                collision = False
+                if self.telemetry is not None:
+                    self.emitDeath(lane)
+                break
+
+        if collision:
+            if self.telemetry is not None:
+                ticks = self.tick - self.levelStart
+                self.telemetry.emit(
+                    "level.finish",
+                    level=self.score.level,
+                    tick=self.tick,
+                    ticks=ticks,
+                    seconds=ticks * self.dt,
+                    lives=self.score.lives,
+                )
+            self.frog.reset()
+            self.score.advance_level()
+            self.startNextLevel()
+        else:
+            self.prepare()
+
+        if profiler is not None:
+            profiler.mark("check")
+        return collision
+
+    """
+        Emit Death Function
+            - This function is responsible for telling the telemetry what the frog just lost a life to,
+            and where
+            - This function also reports the game over, when that was the last life
+    """
+
+    def emitDeath(self, lane):
+        score = self.score
+        level = score.level
+        ticks = self.tick - self.levelStart
+        self.telemetry.emit(
+            "death",
+            level=level,
+            tick=self.tick,
+            ticks=ticks,
+            cause=score.lastCause,
+            laneType=self.lanes[lane].type,
+            lane=lane,
+            lives=score.lives,
         )
+        if score.gameOverCheck():
+            self.telemetry.emit("game.over", game=self.games, level=level, tick=self.tick)
+
+
+"""
+    Scene Class
+        - This class is the base for every screen of the game
+        - Each frame, the Game calls...
+            - handle() for every event
+            - update() once
+            - draw() once
+        - handle() and update() return the scene to switch to, or None to stay on this one
+"""
+
+
+class Scene:
+    def __init__(self, game):
+        self.game = game
+
+    def enter(self):
+        pass
+
+    def handle(self, event):
+        return None
+
+    def update(self):
+        return None
+
+    def draw(self):
+        pass
+
+
+"""
+    Intro Scene Class
+        - This class is responsible for drawing the intro screen
+        - [S] starts the game, [E] exits
+"""
+
+
+class IntroScene(Scene):
+    # Where the loading progress bar is drawn
+    PROGRESS_RECT = pygame.Rect(500, 340, 380, 12)
+
+    def enter(self):
+        self.game.screen.fill((202, 204, 207))
+        self.progress = 0.0
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_s:
+            # Starting before everything is loaded waits for the rest, rather than loading it piece by piece
+            self.game.loadAssets(block=True)
+            return PlayScene(self.game)
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
+            self.game.quit()
+
+    def update(self):
+        self.progress = self.game.loadAssets()
+
+    def draw(self):
+        screen = self.game.screen
+        screen.blit(assets.text("Welcome to Interview Rush!"), (500, 32))
+        screen.blit(assets.text("The goal of this game is to get to as many interviews as possible"), (300, 64))
+        screen.blit(assets.text("by dodging the Q-Line and hopping on boats to get to the GM Building"), (300, 96))
+        screen.blit(assets.text(": Dodge these, when hit you will lose a life"), (350, 175))
+        screen.blit(assets.text(": Ride on these to get across the water"), (350, 260))
+        screen.blit(assets.text("[S] to start the game               [E] to exit"), (500, 300))
+
+        # The sprites only show up once the loader has them, the bar shows how far it got
+        if self.game.ready:
+            screen.blit(assets.image("sprites/qline.png"), (200, 128))
+            screen.blit(assets.image("sprites/boat.png"), (200, 250))
+        bar = self.PROGRESS_RECT
+        screen.fill((120, 120, 120), bar)
+        screen.fill((40, 140, 60), (bar.x, bar.y, round(bar.width * self.progress), bar.height))
+
+        pygame.display.flip()
+        self.game.startupMark("firstFrame")
+
+
+"""
+    Play Scene Class
+        - This class is responsible for playing the game
+            - Entering it starts a fresh game
+            - Key presses are turned into inputs for the world, and applied as soon as the frame starts
+            - The world is stepped at its fixed simulation rate, however fast frames are drawn
+            - Frames are drawn between the last two simulation steps, and presented straight away, so a
+            hop shows up in the same frame that read its key press
+            - After presenting, one more lane of the next level's background is baked
+        - Switches to the game over screen when the lives run out
+"""
+
+
+class PlayScene(Scene):
+    # Most simulation steps one frame may catch up on, the rest of the backlog is dropped
+    MAX_STEPS = 5
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.inputs = []
+        self.accumulator = 0.0
+        self.lastTime = None
+
+    def enter(self):
+        world = self.game.world
+        if self.game.recorder is not None:
+            self.game.recorder.reset(world.tick)
+        if self.game.latency is not None:
+            self.game.latency.discard()
+        world.reset()
+        self.game.resize()
+        self.lastTime = time.perf_counter()
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key in self.game.KEY_MOVES:
+            self.inputs.append(self.game.KEY_MOVES[event.key])
+            if self.game.latency is not None:
+                self.game.latency.pressed(getattr(event, "sent", None))
+
+    def update(self):
+        world = self.game.world
+        renderer = self.game.renderer
+        latency = self.game.latency
+
+        # Hopping now rather than on the next step, which may not be due until a later frame
+        if self.inputs:
+            if self.game.recorder is not None:
+                self.game.recorder.record(world.tick, self.inputs)
+            world.applyInputs(self.inputs)
+            self.inputs = []
+
+        now = time.perf_counter()
+        self.accumulator += now - self.lastTime
+        self.lastTime = now
+
+        # Advancing the world in fixed steps until it has caught up with real time
+        steps = 0
+        while self.accumulator >= world.dt and steps < self.MAX_STEPS:
+            start = time.perf_counter()
+            collision = world.step()
+            self.accumulator -= world.dt
+            steps += 1
+            if collision:
+                self.game.resize()
+                self.game.transitions.append(time.perf_counter() - start)
+            if world.score.gameOverCheck():
+                break
+
+        if world.score.gameOverCheck():
+            return GameOverScene(self.game)
+
+        # A slow machine gives up on the backlog instead of falling further behind every frame
+        if steps == self.MAX_STEPS:
+            self.accumulator = min(self.accumulator, world.dt)
+
+        renderer.draw(world, self.accumulator / world.dt)
+        if latency is not None:
+            latency.drawn()
+        renderer.present()
+        if latency is not None:
+            latency.presented()
+        renderer.prebake(world)
+
+
+"""
+    Game Over Scene Class
+        - This class is responsible for displaying the game over screen
+        - [R] restarts the game, [E] exits
+"""
+
 
-        startText = font.render(
-            "[S] to start the game               [E] to exit", True, (0, 0, 0)
+class GameOverScene(Scene):
+    def enter(self):
+        self.game.screen.fill((202, 204, 207))
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+            return PlayScene(self.game)
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
+            self.game.quit()
+
+    def draw(self):
+        screen = self.game.screen
+        screen.blit(assets.text("Game Over!"), (500, 32))
+        screen.blit(assets.text("[R] to restart the game               [E] to exit"), (500, 300))
+        pygame.display.flip()
+
+
+"""
+    Gameplay Class
+        - This class is responsible for...
+            - Running the active scene, and switching between the intro, play and game over scenes
+            - Keeping the window sized to the world, up to a maximum window size
+"""
+
+
+class Game:
+    # Keys that move the frog, and the move they turn into
+    KEY_MOVES = {
+        pygame.K_LEFT: "left",
+        pygame.K_RIGHT: "right",
+        pygame.K_UP: "up",
+        pygame.K_DOWN: "down",
+    }
+
+    def __init__(
+        self,
+        dirty=False,
+        maxHeight=960,
+        fps=30,
+        simHz=30,
+        profile=None,
+        seed=None,
+        record=None,
+        latency=None,
+        latencyBot=0,
+        measureStartup=False,
+        startupBudget=None,
+        renderScale=1.0,
+        telemetry=None,
+    ):
+        pygame.init()
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.scene = None
+
+        # Every sprite is decoded on a worker thread from here on, while the window opens and the intro
+        # is shown
+        self.loader = AssetLoader(
+            "sprites",
+            masks=[(FROG_IMAGE, None), (POTHOLE_IMAGE, None)]
+            + [(path, OBSTACLE_SIZE) for path in OBSTACLE_IMAGES.values()],
         )
+        self.loader.start()
+        self.ready = False
+
+        # Every game is seeded, so any game can be recorded and replayed
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.world = World(simHz=simHz, seed=seed)
+        self.recorder = None
+        if record is not None:
+            self.recorder = InputRecorder(record, self.world)
+        self.maxHeight = maxHeight
+        self.screen_width = self.world.width
+        self.screen_height = min(self.world.height, self.maxHeight)
+        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+        pygame.display.set_caption("Interview Rush")
 
-        image = pygame.image.load("sprites/qline.png")
-        image2 = pygame.image.load("sprites/boat.png")
+        pygame.key.set_repeat(0, 0)
+        # The world is drawn at renderScale times the window's size and stretched to fit, weak machines can
+        # trade sharpness for frame rate
+        self.renderer = Renderer(self.screen, dirty, renderScale)
+
+        # Profiling is opt-in, profile is the path the frame times are written to on exit
+        self.profile = profile
+        self.profiler = None
+        if profile is not None:
+            self.profiler = FrameProfiler()
+            self.world.profiler = self.profiler
+            self.renderer.profiler = self.profiler
+            self.renderer.overlay = ProfilerOverlay(self.profiler, self.renderer)
+
+        # How long each level switch took, from the finishing step until the new level was ready to draw
+        self.transitions = []
+
+        # Latency measuring is opt-in too, latency is the path the key press latencies are written to on
+        # exit, and latencyBot presses left and right that many times a second
+        self.latencyPath = latency
+        self.latency = None
+        self.latencyBot = None
+        if latency is not None:
+            self.latency = LatencyMeter()
+            if latencyBot > 0:
+                self.latencyBot = LatencyBot(latencyBot, (pygame.K_LEFT, pygame.K_RIGHT), seed)
+                self.latencyBot.start()
+
+        # Seconds from launch to each startup milestone, measureStartup quits once both are reached and
+        # fails when being ready took longer than startupBudget seconds
+        self.measureStartup = measureStartup
+        self.startupBudget = startupBudget
+        self.startupTimes = {}
+
+        # Telemetry is opt-in as well, telemetry is the path gameplay events are appended to, along with a
+        # summary of the frame times every FRAME_SUMMARY_SECONDS
+        self.telemetry = None
+        self.frameTimes = []
+        self.frameStart = None
+        self.summaryStart = None
+        if telemetry is not None:
+            self.telemetry = TelemetryWriter(telemetry)
+            self.world.telemetry = self.telemetry
 
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_s:
-                    self.makeLanes()
-                    self.startUp()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
-                    pygame.quit()
-                    sys.exit()
+    """
+        Load Assets Function
+            - This function is responsible for picking up whatever the loader finished since the last call
+            - Once everything is loaded, the renderer converts its sprites for the display and the game
+            is ready to play
+            - block waits for the loader to finish first
+            - Returns the fraction loaded so far
+    """
 
-            self.screen.blit(text, (500, 32))
-            self.screen.blit(text2, (300, 64))
-            self.screen.blit(text3, (300, 96))
-            self.screen.blit(image, (200, 128))
-            self.screen.blit(qlineText, (350, 175))
+    def loadAssets(self, block=False):
+        progress = self.loader.wait() if block else self.loader.poll()
+        if self.loader.ready and not self.ready:
+            self.renderer.loadAssets()
+            self.ready = True
+            self.startupMark("ready")
+        return progress
 
-            self.screen.blit(image2, (200, 250))
-            self.screen.blit(boatText, (350, 260))
+    """
+        Startup Mark Function
+            - This function is responsible for noting when a startup milestone was first reached
+            - "firstFrame" is the first frame presented, "ready" is everything loaded
+    """
 
-            self.screen.blit(startText, (500, 300))
-            pygame.display.flip()
-            self.clock.tick(30)
+    def startupMark(self, name):
+        if name in self.startupTimes:
+            return
+        self.startupTimes[name] = time.perf_counter() - STARTED
+        if self.measureStartup and len(self.startupTimes) == 2:
+            self.quit()
 
     """
-        Startup Function
-            - This is the main startup function for the program, running this function allows the game to be played
+        Make Lanes Function
+            - This function is responsible for building the lanes for the current level
+            - This function also resizes the window when the world grew
     """
 
-    def startUp(self):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+    def makeLanes(self):
+        self.world.makeLanes()
+        self.resize()
+
+    """
+        Resize Function
+            - This function is responsible for matching the window to the world's playfield
+            - The window never grows past maxHeight, the renderer scrolls the playfield instead
+            - The display mode is only set again when the window size actually changes
+            - This function also clears the screen and bakes the new level's background
+    """
 
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_LEFT:
-                    self.frog.move(-1, 0)
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_RIGHT:
-                    self.frog.move(1, 0)
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_UP:
-                    self.frog.move(0, -1)
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_DOWN:
-                    self.frog.move(0, 1)
+    def resize(self):
+        size = (self.world.width, min(self.world.height, self.maxHeight))
+        if size != (self.screen_width, self.screen_height):
+            self.screen_width, self.screen_height = size
+            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+            self.renderer.screen = self.screen
 
-            pygame.display.flip()
+        self.screen.fill((0, 0, 0))
+        self.renderer.bake(self.world)
 
-            # Drawing and updating the group that holds the lane sprites
-            self.lanes.draw(self.screen)
-            self.lanes.update(self.screen)
+    """
+        Quit Function
+            - This function is responsible for closing the game
+            - This function also reports how much of the screen dirty rendering pushed per frame
+            - This function also writes the profiler's frame times and reports the level switch times and
+            the asset registry's counters, when profiling
+            - This function also finishes the recording, when recording
+            - This function also reports and writes the input to present latencies, when measuring them
+            - This function also reports the startup times, when measuring them, and exits with status 1
+            when the game took longer than its budget to be ready
+            - This function also writes the last frame time summary and closes the telemetry log, when
+            writing one
+    """
 
-            # Updating the frog's position
-            self.frog.update(self.screen, self.screen_height)
+    def quit(self):
+        status = 0
+        if self.telemetry is not None:
+            self.summarizeFrames()
+            self.telemetry.emit("game.quit", level=self.world.score.level, tick=self.world.tick)
+            if not self.telemetry.close():
+                print(f"Telemetry log {self.telemetry.path} was not closed, the writer is still waiting on the disk")
+            if self.telemetry.dropped or self.telemetry.lost:
+                print(
+                    f"Telemetry dropped {self.telemetry.dropped} events and lost {self.telemetry.lost} to write"
+                    f" errors, {self.telemetry.written} were written"
+                )
+        if self.renderer.dirty:
+            print(f"Dirty rendering updated {self.renderer.averageFraction():.1%} of the screen per frame")
+        if self.profiler is not None:
+            self.profiler.dump(self.profile)
+            stats = assets.stats()
+            print(
+                f"Assets: {stats['hits']} cache hits, {stats['misses']} misses, {stats['loads']} disk loads,"
+                f" {stats['renders']} text renders ({stats['rendersPerMinute']:.1f} per minute)"
+            )
+            if self.transitions:
+                mean = sum(self.transitions) / len(self.transitions) * 1000
+                slowest = max(self.transitions) * 1000
+                print(f"{len(self.transitions)} level switches took {mean:.2f} ms on average, slowest {slowest:.2f} ms")
+        if self.recorder is not None:
+            self.recorder.close(self.world)
+        if self.latency is not None:
+            if self.latencyBot is not None:
+                self.latencyBot.stop()
+            self.latency.dump(self.latencyPath)
+            summary = self.latency.summary()
+            print(
+                f"{summary['presses']} key presses, input to present p50 {summary['p50']:.1f} ms,"
+                f" p95 {summary['p95']:.1f} ms, p99 {summary['p99']:.1f} ms, slowest {summary['max']:.1f} ms"
+            )
+        if self.measureStartup:
+            firstFrame = self.startupTimes.get("firstFrame")
+            ready = self.startupTimes.get("ready")
+            for name, seconds in (("first frame", firstFrame), ("ready", ready)):
+                print(f"Startup {name}: " + (f"{seconds * 1000:.1f} ms" if seconds is not None else "not reached"))
+            if self.startupBudget is not None and (ready is None or ready > self.startupBudget):
+                print(f"FAILED: not ready within the {self.startupBudget * 1000:.0f} ms budget")
+                status = 1
+        pygame.quit()
+        sys.exit(status)
 
-            lane = int((self.frog.pos_y - 56) / 128)
-            lane_list = self.lanes.sprites()
+    """
+        Switch Function
+            - This function is responsible for making a scene the active one
+    """
 
-            collision = lane_list[lane].check(self.frog, self.score)
+    def switch(self, scene):
+        self.scene = scene
+        self.scene.enter()
 
-            if self.score.gameOverCheck():
-                self.gameOver()
+    """
+        Time Frame Function
+            - This function is responsible for noting how long the last frame took, from the start of one
+            frame to the start of the next, and summarizing them every FRAME_SUMMARY_SECONDS
+    """
 
-            if collision:
-                self.frog.reset()
-                self.score.advance_level()
-                self.makeLanes()
+    def timeFrame(self):
+        now = time.perf_counter()
+        if self.frameStart is not None:
+            self.frameTimes.append(now - self.frameStart)
+        else:
+            self.summaryStart = now
+        self.frameStart = now
+        if now - self.summaryStart >= FRAME_SUMMARY_SECONDS:
+            self.summarizeFrames()
+            self.summaryStart = now
+
+    """
+        Summarize Frames Function
+            - This function is responsible for telling the telemetry how long the frames since the last
+            summary took, in milliseconds
+    """
+
+    def summarizeFrames(self):
+        times = sorted(self.frameTimes)
+        self.frameTimes.clear()
+        if not times:
+            return
+        self.telemetry.emit(
+            "frames",
+            scene=type(self.scene).__name__,
+            level=self.world.score.level,
+            count=len(times),
+            mean=sum(times) / len(times) * 1000,
+            p50=percentile(times, 0.50) * 1000,
+            p99=percentile(times, 0.99) * 1000,
+            max=times[-1] * 1000,
+        )
+
+    """
+        Frame Function
+            - This function is responsible for running one frame of whichever scene is active
+            - Scenes never call each other, they hand back the next scene and this function switches to it
+            - The wait for the frame rate comes last, so events are read just before the frame that
+            uses them is drawn and presented
+            - [F3] shows or hides the profiler overlay, when profiling
+    """
+
+    def frame(self):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin()
+        if self.telemetry is not None:
+            self.timeFrame()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.quit()
+            if profiler is not None and event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.renderer.overlay.toggle()
+                continue
+
+            nextScene = self.scene.handle(event)
+            if nextScene is not None:
+                self.switch(nextScene)
 
-            if self.score.gameover == True:
-                pygame.quit()
+        if profiler is not None:
+            profiler.mark("events")
 
-            self.score.draw_hud(self.screen)
-            self.clock.tick(30)
+        nextScene = self.scene.update()
+        if nextScene is not None:
+            self.switch(nextScene)
+
+        self.scene.draw()
+        self.clock.tick(self.fps)
+        if profiler is not None:
+            profiler.mark("idle")
+
+    """
+        Run Function
+            - This is the main function for the program, running this function allows the game to be played
+            - One loop drives every scene, so restarting the game never grows the stack
+    """
+
+    def run(self):
+        self.switch(IntroScene(self))
+        while True:
+            self.frame()
 
 
 if __name__ == "__main__":
-    game = Game()
-    game.intro()
-    # game.makeLanes()
-    # game.startUp()
+    parser = argparse.ArgumentParser(description="Interview Rush")
+    parser.add_argument(
+        "--dirty", action="store_true", help="only repaint and update the parts of the screen that changed"
+    )
+    parser.add_argument(
+        "--max-height", type=int, default=960, help="tallest the window may grow, in pixels"
+    )
+    parser.add_argument(
+        "--fps", type=int, default=30, help="most frames drawn per second, 0 for no limit"
+    )
+    parser.add_argument(
+        "--sim-hz", type=int, default=30, help="simulation steps per second, independent of --fps"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="time every phase of every frame, [F3] shows the overlay, frame times are written to PATH"
+        " (.csv or .json) on exit",
+    )
+    parser.add_argument("--seed", type=int, help="seed for the level layouts, random when not given")
+    parser.add_argument(
+        "--record", metavar="PATH", help="record every input to PATH, play it back with replay.py"
+    )
+    parser.add_argument(
+        "--measure-latency",
+        metavar="PATH",
+        help="time every key press until the frame showing its move is presented, written to PATH on exit",
+    )
+    parser.add_argument(
+        "--latency-bot",
+        type=float,
+        default=0,
+        metavar="RATE",
+        help="with --measure-latency, press left and right on their own RATE times a second",
+    )
+    parser.add_argument(
+        "--measure-startup",
+        action="store_true",
+        help="report the time to the first frame and to everything loaded, then quit",
+    )
+    parser.add_argument(
+        "--startup-budget",
+        type=float,
+        metavar="MS",
+        help="with --measure-startup, exit with status 1 when the game is not ready within MS milliseconds",
+    )
+    parser.add_argument(
+        "--render-scale",
+        type=float,
+        default=1.0,
+        metavar="FRACTION",
+        help="draw the world at this fraction of the window's resolution and stretch it to fit, 0.5 draws"
+        " a quarter of the pixels",
+    )
+    parser.add_argument(
+        "--telemetry",
+        metavar="PATH",
+        help="append gameplay events and frame time summaries to PATH, roll them up with telemetry_report.py",
+    )
+    args = parser.parse_args()
+    if args.sim_hz <= 0:
+        parser.error("--sim-hz must be above 0")
+    if args.record is not None:
+        if args.seed is not None and not 0 <= args.seed <= MAX_SEED:
+            parser.error(f"--seed must be from 0 to {MAX_SEED} to be recorded")
+        if args.sim_hz > MAX_SIM_HZ:
+            parser.error(f"--sim-hz must be at most {MAX_SIM_HZ} to be recorded")
+    if not 0 < args.render_scale <= 1:
+        parser.error("--render-scale must be above 0 and at most 1")
+
+    game = Game(
+        dirty=args.dirty,
+        maxHeight=args.max_height,
+        fps=args.fps,
+        simHz=args.sim_hz,
+        profile=args.profile,
+        seed=args.seed,
+        record=args.record,
+        latency=args.measure_latency,
+        latencyBot=args.latency_bot,
+        measureStartup=args.measure_startup,
+        startupBudget=args.startup_budget / 1000 if args.startup_budget is not None else None,
+        renderScale=args.render_scale,
+        telemetry=args.telemetry,
+    )
+    game.run()
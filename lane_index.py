@@ -0,0 +1,101 @@
+from bisect import bisect_right
+
+
+def _left(obstacle):
+    return obstacle.rect.left
+
+
+"""
+    Lane Index Class
+        - This class is responsible for keeping a lane's obstacles sorted by the left edge of their rect
+            - After the obstacles move, update() only fixes the few pairs that swapped places, or the
+            obstacles that wrapped around to the other side of the screen
+            - overlapping() uses binary search to find the obstacles whose x-extent overlaps a range,
+            so a check only looks at the obstacles near the frog
+        - The index keeps its lists for its whole life, so resetting it for a pooled lane allocates nothing
+        - In vectorized mode the obstacles live in an ObstacleStore, which keeps them sorted itself, and
+        follow() makes the index answer from the store until it is reset
+"""
+
+
+class LaneIndex:
+    def __init__(self, obstacles=()):
+        self.obstacles = []
+        self.lefts = []
+        self.store = None
+        self.lane = None
+        self.reset(obstacles)
+
+    """
+        Reset Function
+            - This function is responsible for building the index from scratch for a new set of obstacles
+    """
+
+    def reset(self, obstacles):
+        self.store = None
+        self.obstacles[:] = obstacles
+        self.obstacles.sort(key=_left)
+        self.lefts.clear()
+        self.maxWidth = 0
+        for obstacle in self.obstacles:
+            rect = obstacle.rect
+            self.lefts.append(rect.left)
+            self.maxWidth = max(self.maxWidth, rect.width)
+
+    """
+        Follow Function
+            - This function is responsible for handing the index over to lane number lane of an
+            ObstacleStore
+    """
+
+    def follow(self, store, lane):
+        self.reset(())
+        self.store = store
+        self.lane = lane
+
+    """
+        Update Function
+            - This function is responsible for bringing the index up to date after the obstacles moved
+            - Obstacles only move a few pixels per step, so the order barely changes and an insertion
+            pass costs about one look at each obstacle
+    """
+
+    def update(self):
+        obstacles = self.obstacles
+        lefts = self.lefts
+        for i, obstacle in enumerate(obstacles):
+            lefts[i] = obstacle.rect.left
+
+        for i in range(1, len(obstacles)):
+            left = lefts[i]
+            if left >= lefts[i - 1]:
+                continue
+
+            # Sliding the obstacle back to its place, a wrapped obstacle slides all the way to the front
+            obstacle = obstacles[i]
+            j = i - 1
+            while j >= 0 and lefts[j] > left:
+                lefts[j + 1] = lefts[j]
+                obstacles[j + 1] = obstacles[j]
+                j -= 1
+            lefts[j + 1] = left
+            obstacles[j + 1] = obstacle
+
+    """
+        Overlapping Function
+            - This function is responsible for finding the obstacles whose x-extent overlaps [left, right)
+            - Returns them in order of their left edge
+    """
+
+    def overlapping(self, left, right):
+        if self.store is not None:
+            return self.store.overlapping(self.lane, left, right)
+        lefts = self.lefts
+        i = bisect_right(lefts, left - self.maxWidth)
+        found = []
+        while i < len(lefts) and lefts[i] < right:
+            obstacle = self.obstacles[i]
+            if obstacle.rect.right > left:
+                found.append(obstacle)
+            i += 1
+        return found
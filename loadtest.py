@@ -0,0 +1,218 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+from profiler import percentile
+from replay import MOVE_CODES
+from server import (
+    HELLO,
+    INPUT,
+    RESET,
+    WELCOME,
+    LANES,
+    STATE,
+    HELLO_BODY,
+    WELCOME_BODY,
+    LANES_HEAD,
+    STATE_HEAD,
+    pack,
+    readMessage,
+)
+
+"""
+    Load Test
+        - This script connects many clients to a game server at once and plays on every one of them
+            - Each client says HELLO with its own seed, sends a random move now and then, and asks for a
+            new game when its lives run out
+            - Every LANES and STATE message is decoded, so a malformed one fails the run
+        - It reports how many state updates each client got against the server's simulation rate, the
+        gaps between consecutive ticks, and the bandwidth used
+        - --spawn starts a server for the run and stops it afterwards
+        - Run it with: python loadtest.py --clients 300 --seconds 20 --spawn
+"""
+
+
+"""
+    Client Class
+        - This class is responsible for one connection to the server, and what it received
+"""
+
+
+class Client:
+    def __init__(self, seed, inputRate):
+        self.seed = seed
+        self.inputRate = inputRate
+        self.rng = random.Random(seed)
+        self.states = 0
+        self.lanes = 0
+        self.bytes = 0
+        self.resets = 0
+        self.gaps = []
+        self.obstacles = 0
+        self.lastTick = None
+        self.error = None
+
+    """
+        Play Function
+            - This function is responsible for connecting, and then reading and playing until stop is set
+    """
+
+    async def play(self, connect, stop):
+        reader, writer = await connect()
+        writer.write(pack(HELLO, HELLO_BODY.pack(self.seed, 0)))
+        type, payload = await readMessage(reader)
+        if type != WELCOME:
+            self.error = "no WELCOME"
+            writer.close()
+            return
+        id, simHz, seed = WELCOME_BODY.unpack(payload)
+
+        sender = asyncio.create_task(self.sendInputs(writer, stop))
+        try:
+            while not stop.is_set():
+                type, payload = await readMessage(reader)
+                if type is None:
+                    self.error = "server hung up"
+                    break
+                self.bytes += 3 + len(payload)
+                if type == LANES:
+                    self.readLanes(payload)
+                elif type == STATE:
+                    self.readState(payload, writer)
+        except Exception as error:
+            self.error = repr(error)
+        finally:
+            sender.cancel()
+            writer.close()
+
+    def readLanes(self, payload):
+        level, count = LANES_HEAD.unpack_from(payload)
+        lanes = payload[LANES_HEAD.size : LANES_HEAD.size + 3 * count]
+        self.obstacles = sum(lanes[1::3])
+        potholes = sum(lanes[2::3])
+        if len(payload) != LANES_HEAD.size + 3 * count + 2 * potholes:
+            raise ValueError("LANES message of the wrong size")
+        self.lanes += 1
+        self.lastTick = None
+
+    def readState(self, payload, writer):
+        tick, level, lives, frogX, frogY = STATE_HEAD.unpack_from(payload)
+        if len(payload) != STATE_HEAD.size + 2 * self.obstacles:
+            raise ValueError("STATE message of the wrong size")
+        self.states += 1
+        if self.lastTick is not None:
+            self.gaps.append(tick - self.lastTick)
+        self.lastTick = tick
+        if lives == 0:
+            self.resets += 1
+            writer.write(pack(RESET))
+
+    """
+        Send Inputs Function
+            - This function is responsible for pressing a random key inputRate times a second on average
+    """
+
+    async def sendInputs(self, writer, stop):
+        moves = list(MOVE_CODES.values())
+        while not stop.is_set():
+            await asyncio.sleep(self.rng.expovariate(self.inputRate))
+            writer.write(pack(INPUT, bytes([self.rng.choice(moves)])))
+
+
+"""
+    Wait For Server Function
+        - This function is responsible for retrying the first connection until the server is listening
+"""
+
+
+async def waitForServer(connect, seconds=10):
+    deadline = time.perf_counter() + seconds
+    while True:
+        try:
+            reader, writer = await connect()
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run(args):
+    if args.unix:
+        connect = lambda: asyncio.open_unix_connection(args.unix)
+    else:
+        connect = lambda: asyncio.open_connection(args.host, args.port)
+    await waitForServer(connect)
+
+    stop = asyncio.Event()
+    clients = [Client(args.seed + i, args.input_rate) for i in range(args.clients)]
+    tasks = []
+    for client in clients:
+        tasks.append(asyncio.create_task(client.play(connect, stop)))
+        # Connecting gradually, like a fleet coming online, rather than all in the same instant
+        await asyncio.sleep(args.ramp / args.clients)
+
+    start = time.perf_counter()
+    for client in clients:
+        client.states = client.bytes = 0
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    elapsed = time.perf_counter() - start
+    await asyncio.wait(tasks, timeout=5)
+    return clients, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the game server with many clients")
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=20, help="how long to measure once every client is in")
+    parser.add_argument("--ramp", type=float, default=2, help="seconds over which the clients connect")
+    parser.add_argument("--input-rate", type=float, default=2, help="key presses per second per client")
+    parser.add_argument("--seed", type=int, default=1, help="first seed, clients use consecutive seeds")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", metavar="PATH", help="connect over a Unix socket instead of TCP")
+    parser.add_argument("--sim-hz", type=int, default=30, help="the server's simulation rate, for --spawn")
+    parser.add_argument("--spawn", action="store_true", help="start a server for the run")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        command = [sys.executable, "server.py", "--sim-hz", str(args.sim_hz), "--stats", "5"]
+        if args.unix:
+            command += ["--unix", args.unix, "--port", "0"]
+        else:
+            command += ["--host", args.host, "--port", str(args.port)]
+        server = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    try:
+        clients, elapsed = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    failed = [client for client in clients if client.error is not None]
+    rates = sorted(client.states / elapsed for client in clients)
+    gaps = sorted(gap for client in clients for gap in client.gaps)
+    late = sum(1 for gap in gaps if gap > 1)
+    received = sum(client.bytes for client in clients)
+    print(f"{len(clients)} clients for {elapsed:.1f} s, {len(failed)} failed")
+    for client in failed[:5]:
+        print(f"  client {client.seed}: {client.error}")
+    print(
+        f"state updates per client per second: p1 {percentile(rates, 0.01):.1f},"
+        f" p50 {percentile(rates, 0.50):.1f}, of {args.sim_hz} expected"
+    )
+    print(f"ticks between updates: {late / len(gaps) if gaps else 0:.2%} skipped a tick, largest {max(gaps, default=0)}")
+    print(f"received {received / elapsed / 1024:.0f} KiB/s, {sum(client.resets for client in clients)} game overs")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+from itertools import repeat
+
+import numpy as np
+import pygame
+
+from renderer import LAYER_POTHOLES, LAYER_OBSTACLES
+
+# Obstacle types are stored as small integers in the type array
+TYPES = {"car": 0, "water": 1}
+TYPE_NAMES = {code: name for name, code in TYPES.items()}
+KINDS = np.array([TYPE_NAMES[code] for code in range(len(TYPES))], dtype=object)
+
+# Rows are kept sorted by lane * LANE_SPAN + left edge, so each lane's obstacles sit together, by left edge
+LANE_SPAN = 2**32
+
+
+"""
+    Round Function
+        - This function is responsible for rounding positions the same way pygame.Rect does,
+        halves round away from zero
+"""
+
+
+def _round(values):
+    return np.trunc(values + np.copysign(0.5, values))
+
+
+"""
+    Obstacle View Class
+        - This class is responsible for letting the rest of the game treat one row of an ObstacleStore
+        like an Obstacle object
+            - Lane.check reads its rect and attaches the frog to it
+            - Frog.update reads its velocity
+            - The Renderer reads its position and pothole
+"""
+
+
+class ObstacleView:
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def pos_x(self):
+        return self.store.x[self.index]
+
+    @property
+    def pos_y(self):
+        return self.store.y[self.index]
+
+    @property
+    def prev_x(self):
+        return self.store.prevX[self.index]
+
+    @property
+    def velocity(self):
+        return self.store.velocity[self.index]
+
+    @property
+    def width(self):
+        return self.store.width[self.index]
+
+    @property
+    def type(self):
+        return TYPE_NAMES[self.store.type[self.index]]
+
+    @property
+    def rect(self):
+        store = self.store
+        i = self.index
+        return pygame.Rect(store.left[i], store.top[i], store.rectW[i], store.rectH[i])
+
+    @property
+    def pothole_x(self):
+        return self.store.potholeX[self.index]
+
+    @property
+    def pothole_y(self):
+        return self.store.potholeY[self.index]
+
+    @property
+    def rect2(self):
+        store = self.store
+        i = self.index
+        if not store.pothole[i]:
+            return None
+        return pygame.Rect(store.potholeLeft[i], store.potholeTop[i], store.potholeW[i], store.potholeH[i])
+
+
+"""
+    Obstacle Store Class
+        - This class is responsible for keeping every obstacle of every lane in NumPy arrays...
+            - The position, velocity and wraparound width
+            - The lane and type of the obstacle
+            - The collision rect, refreshed for all obstacles at once
+        - This class moves all obstacles with whole-array operations, so the cost of a frame stays
+        flat as the number of obstacles grows
+        - This class also keeps the rows in the order a LaneIndex keeps each lane's obstacles, sorted
+        again after every update, so finding the obstacles near the frog is a binary search
+"""
+
+
+class ObstacleStore:
+    FIELDS = {
+        "x": np.float64,
+        "prevX": np.float64,
+        "y": np.float64,
+        "velocity": np.float64,
+        "width": np.float64,
+        "lane": np.int32,
+        "type": np.int8,
+        "left": np.int64,
+        "top": np.int64,
+        "rectW": np.int64,
+        "rectH": np.int64,
+        "pothole": np.bool_,
+        "potholeX": np.float64,
+        "potholeY": np.float64,
+        "potholeLeft": np.int64,
+        "potholeTop": np.int64,
+        "potholeW": np.int64,
+        "potholeH": np.int64,
+    }
+
+    def __init__(self, capacity=64, screenWidth=1280):
+        self.screenWidth = screenWidth
+        self.count = 0
+        self.capacity = 0
+        self.views = []
+        self.order = None
+        self.keys = None
+        self.maxWidth = 0
+        self.grow(capacity)
+
+    """
+        Grow Function
+            - This function is responsible for making room for more obstacles
+            - The arrays double in size so adding obstacles one by one stays cheap
+    """
+
+    def grow(self, capacity):
+        for name, dtype in self.FIELDS.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if self.count:
+                array[: self.count] = getattr(self, name)[: self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    """
+        Clear Function
+            - This function is responsible for emptying the store when a new level is made
+            - The views are kept, add() hands them out again for the new obstacles
+    """
+
+    def clear(self):
+        self.count = 0
+        self.order = None
+
+    """
+        Add Function
+            - This function is responsible for copying an Obstacle into the store
+            - Returns an ObstacleView the lane can keep in place of the Obstacle
+    """
+
+    def add(self, obstacle, lane):
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+
+        i = self.count
+        self.x[i] = obstacle.pos_x
+        self.prevX[i] = obstacle.prev_x
+        self.y[i] = obstacle.pos_y
+        self.velocity[i] = obstacle.velocity
+        self.width[i] = obstacle.width
+        self.lane[i] = lane
+        self.type[i] = TYPES[obstacle.type]
+        self.left[i] = obstacle.rect.x
+        self.top[i] = obstacle.rect.y
+        self.rectW[i] = obstacle.rect.width
+        self.rectH[i] = obstacle.rect.height
+
+        self.pothole[i] = obstacle.rect2 is not None
+        self.potholeX[i] = obstacle.pothole_x
+        self.potholeY[i] = obstacle.pothole_y
+        if obstacle.rect2 is not None:
+            self.potholeLeft[i] = obstacle.rect2.x
+            self.potholeTop[i] = obstacle.rect2.y
+            self.potholeW[i] = obstacle.rect2.width
+            self.potholeH[i] = obstacle.rect2.height
+
+        self.count += 1
+        self.order = None
+        if i == len(self.views):
+            self.views.append(ObstacleView(self, i))
+        return self.views[i]
+
+    """
+        Update Function
+            - This function is responsible for moving every obstacle by its velocity, for dt seconds
+            - This function also wraps obstacles that ran off the screen and refreshes their rects,
+            following the same rules as Obstacle.update
+            - Potholes never move, their rects are set once by add()
+    """
+
+    def update(self, dt):
+        n = self.count
+        x = self.x[:n]
+        velocity = self.velocity[:n]
+        width = self.width[:n]
+
+        self.prevX[:n] = x
+        x += velocity * dt
+
+        # Restarting obstacles that ran off the edge on the other side
+        wrapRight = (velocity > 0) & (x > self.screenWidth + 64)
+        wrapLeft = (velocity < 0) & (x < -width)
+        x[wrapRight] = -width[wrapRight]
+        x[wrapLeft] = self.screenWidth
+        wrapped = wrapRight | wrapLeft
+        self.prevX[:n][wrapped] = x[wrapped]
+
+        # Refreshing the rects, with their top left corner on the obstacle's position
+        self.left[:n] = _round(x)
+        self.top[:n] = _round(self.y[:n])
+        self.sortRows()
+
+    """
+        Sort Rows Function
+            - This function is responsible for bringing the lane by lane order of the rows up to date
+            - The sort is stable and starts from the last order, so obstacles level with each other keep
+            their places, like LaneIndex.update's insertion pass, and nearly sorted rows sort quickly
+            - Rows added since the last sort are sorted from the order they were added, like
+            LaneIndex.reset
+    """
+
+    def sortRows(self):
+        n = self.count
+        keys = self.lane[:n].astype(np.int64) * LANE_SPAN + self.left[:n]
+        if self.order is None:
+            self.order = np.argsort(keys, kind="stable")
+            self.maxWidth = int(self.rectW[:n].max()) if n else 0
+            self.keys = keys[self.order]
+            return
+
+        # Obstacles mostly keep their order, only a wrap or an overtake needs the sort
+        keys = keys[self.order]
+        if n > 1 and (keys[1:] < keys[:-1]).any():
+            moved = np.argsort(keys, kind="stable")
+            self.order = self.order[moved]
+            keys = keys[moved]
+        self.keys = keys
+
+    """
+        Draw Items Function
+            - This function is responsible for telling the Renderer what to draw, like Obstacle.drawItems
+            does for one obstacle
+            - Positions are worked out for every obstacle at once and handed over as plain lists
+    """
+
+    def drawItems(self, alpha, layers):
+        n = self.count
+        prevX = self.prevX[:n]
+        x = prevX + (self.x[:n] - prevX) * alpha
+        layers[LAYER_OBSTACLES].extend(zip(KINDS[self.type[:n]].tolist(), x.tolist(), self.y[:n].tolist()))
+
+        pothole = self.pothole[:n]
+        potholeX = self.potholeX[:n][pothole].tolist()
+        layers[LAYER_POTHOLES].extend(zip(repeat("pothole"), potholeX, self.potholeY[:n][pothole].tolist()))
+
+    """
+        Nearby Function
+            - This function is responsible for finding the rows of one lane whose x-extent overlaps
+            [left, right), like LaneIndex.overlapping
+            - Only the lane's rows near the range are looked at, found by binary search in the sorted rows
+            - Returns the row numbers in the order a LaneIndex keeps them, by left edge
+    """
+
+    def nearby(self, lane, left, right):
+        if self.order is None:
+            self.sortRows()
+        base = lane * LANE_SPAN
+        start = self.keys.searchsorted(base + left - self.maxWidth, "right")
+        stop = self.keys.searchsorted(base + right, "left")
+        rows = self.order[start:stop]
+        return rows[self.left[rows] + self.rectW[rows] > left]
+
+    """
+        Overlapping Function
+            - This function is responsible for answering LaneIndex.overlapping for a lane whose index
+            follows the store
+    """
+
+    def overlapping(self, lane, left, right):
+        return [self.views[i] for i in self.nearby(lane, left, right).tolist()]
+
+    """
+        Colliding Function
+            - This function is responsible for finding the obstacles of one lane that overlap a rect
+            - Returns their views in the order the lane's LaneIndex would keep them, so the frog rides the
+            same boat as it does with Obstacle objects
+            - Only the rects are compared, Lane.check compares the masks of the ones returned
+    """
+
+    def colliding(self, lane, rect):
+        rows = self.nearby(lane, rect.left, rect.right)
+        top = self.top[rows]
+        rows = rows[(top < rect.bottom) & (top + self.rectH[rows] > rect.top)]
+        return [self.views[i] for i in rows.tolist()]
@@ -0,0 +1,39 @@
+"""
+    Pool Class
+        - This class is responsible for keeping objects that are no longer used, so they can be handed out
+        again instead of allocating new ones
+            - acquire() reinitializes a free object in place with its reinit(), or makes a new one with
+            factory() when none are free, both take the same arguments
+            - release() hands an object back to the pool
+        - created and reused count how often each happened, a pool that has warmed up only reuses
+"""
+
+
+class Pool:
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    """
+        Acquire Function
+            - This function is responsible for handing out an object set up with the given arguments
+    """
+
+    def acquire(self, *args):
+        if self.free:
+            self.reused += 1
+            item = self.free.pop()
+            item.reinit(*args)
+            return item
+        self.created += 1
+        return self.factory(*args)
+
+    """
+        Release Function
+            - This function is responsible for taking back an object that is no longer used
+    """
+
+    def release(self, item):
+        self.free.append(item)
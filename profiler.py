@@ -0,0 +1,314 @@
+import csv
+import json
+import random
+import threading
+import time
+
+import pygame
+
+from assets import assets, FONT
+
+# Phases of a frame, in the order they happen
+PHASES = (
+    "events",
+    "lanes.update",
+    "frog.update",
+    "check",
+    "lanes.draw",
+    "sprites.draw",
+    "scale",
+    "hud",
+    "flip",
+    "prebake",
+    "idle",
+)
+
+
+"""
+    Percentile Function
+        - This function is responsible for picking the value below which a fraction of sorted values fall
+"""
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    index = min(int(fraction * len(values)), len(values) - 1)
+    return values[index]
+
+
+"""
+    Frame Profiler Class
+        - This class is responsible for timing each phase of every frame
+            - mark() charges the time since the last mark to a phase, so the hot paths only pay for
+            one perf_counter call per phase
+            - Finished frames go into a fixed-size ring buffer, the oldest frame is overwritten
+        - This class is also responsible for...
+            - Summarizing the buffer as FPS, p50/p99 frame time and a per-phase breakdown
+            - Writing the buffer to CSV or JSON
+"""
+
+
+class FrameProfiler:
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.phaseIndex = {phase: i for i, phase in enumerate(PHASES)}
+        self.frames = [[0.0] * (len(PHASES) + 1) for i in range(capacity)]
+        self.count = 0
+        self.current = [0.0] * len(PHASES)
+        self.frameStart = None
+        self.last = None
+
+    """
+        Begin Function
+            - This function is responsible for starting a new frame
+            - The frame before it is finished and stored, from its start to this one's start
+    """
+
+    def begin(self):
+        now = time.perf_counter()
+        if self.frameStart is not None:
+            row = self.frames[self.count % self.capacity]
+            row[: len(PHASES)] = self.current
+            row[len(PHASES)] = now - self.frameStart
+            self.count += 1
+        self.current = [0.0] * len(PHASES)
+        self.frameStart = now
+        self.last = now
+
+    """
+        Mark Function
+            - This function is responsible for charging the time since the last mark to a phase
+            - A phase marked more than once in a frame adds up
+    """
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        if self.last is not None:
+            self.current[self.phaseIndex[phase]] += now - self.last
+        self.last = now
+
+    """
+        Rows Function
+            - This function is responsible for returning the stored frames, oldest first
+    """
+
+    def rows(self):
+        if self.count <= self.capacity:
+            return self.frames[: self.count]
+        start = self.count % self.capacity
+        return self.frames[start:] + self.frames[:start]
+
+    """
+        Summary Function
+            - This function is responsible for summarizing the stored frames
+            - Times are in milliseconds
+    """
+
+    def summary(self):
+        rows = self.rows()
+        totals = sorted(row[len(PHASES)] for row in rows)
+        mean = sum(totals) / len(totals) if totals else 0.0
+        phases = {}
+        for phase, i in self.phaseIndex.items():
+            phases[phase] = sum(row[i] for row in rows) / len(rows) * 1000 if rows else 0.0
+        return {
+            "frames": len(rows),
+            "fps": 1 / mean if mean > 0 else 0.0,
+            "p50": percentile(totals, 0.50) * 1000,
+            "p99": percentile(totals, 0.99) * 1000,
+            "phases": phases,
+        }
+
+    """
+        Dump Function
+            - This function is responsible for writing the stored frames to a file
+            - Paths ending in .json get JSON, anything else gets CSV
+    """
+
+    def dump(self, path):
+        header = list(PHASES) + ["total"]
+        rows = self.rows()
+        if path.endswith(".json"):
+            with open(path, "w") as file:
+                json.dump(
+                    {
+                        "summary": self.summary(),
+                        "frames": [dict(zip(header, row)) for row in rows],
+                    },
+                    file,
+                    indent=1,
+                )
+        else:
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(header)
+                writer.writerows(rows)
+
+
+"""
+    Profiler Overlay Class
+        - This class is responsible for drawing the profiler's summary in the corner of the screen
+        - The text is only rendered again every refresh frames, so the overlay barely shows up in
+        the numbers it is drawing
+"""
+
+
+class ProfilerOverlay:
+    def __init__(self, profiler, renderer, refresh=15):
+        self.profiler = profiler
+        self.renderer = renderer
+        self.refresh = refresh
+        self.visible = False
+        self.surfaces = []
+        self.frames = 0
+
+    """
+        Toggle Function
+            - This function is responsible for showing or hiding the overlay
+    """
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.frames = 0
+        self.renderer.reset()
+
+    """
+        Lines Function
+            - This function is responsible for turning the profiler's summary into lines of text
+            - The asset registry's counters come last
+    """
+
+    def lines(self):
+        summary = self.profiler.summary()
+        lines = [f"FPS {summary['fps']:.0f}  p50 {summary['p50']:.1f} ms  p99 {summary['p99']:.1f} ms"]
+        if self.renderer.dirty:
+            lines.append(f"dirty {self.renderer.updatedFraction:.1%} of screen")
+        for phase, milliseconds in summary["phases"].items():
+            lines.append(f"{phase:<13} {milliseconds:6.2f} ms")
+
+        # The asset registry's counters, loads should stay put while playing and renders barely move
+        stats = assets.stats()
+        lines.append(f"assets {stats['hits']} hits  {stats['misses']} misses  {stats['loads']} loads")
+        lines.append(f"text   {stats['renders']} renders  {stats['rendersPerMinute']:.1f} per minute")
+        return lines
+
+    """
+        Draw Function
+            - This function is responsible for drawing the overlay onto the screen
+            - Returns the rect of the screen that was drawn on
+    """
+
+    def draw(self, screen):
+        if self.frames % self.refresh == 0:
+            font = assets.font(FONT, 16)
+            self.surfaces = [assets.render(font, line, (255, 255, 255), overlay=True) for line in self.lines()]
+        self.frames += 1
+
+        width = max(surface.get_width() for surface in self.surfaces) + 16
+        height = sum(surface.get_height() for surface in self.surfaces) + 16
+        area = screen.fill((0, 0, 0), (8, 8, width, height))
+        y = 16
+        for surface in self.surfaces:
+            screen.blit(surface, (16, y))
+            y += surface.get_height()
+        return area
+
+
+"""
+    Latency Meter Class
+        - This class is responsible for measuring how long a key press takes to show up on screen
+            - pressed() is called for every key press that moves the frog
+            - drawn() is called once the frame being drawn includes every move pressed so far
+            - presented() is called right after that frame is flipped to the display, and records the
+            time from each press to now
+        - A press is timed from when the game read it from the event queue, or from when it was posted
+        when the event carries its own time, like the LatencyBot's do
+        - Times are in milliseconds
+"""
+
+
+class LatencyMeter:
+    def __init__(self):
+        self.pending = []
+        self.shown = []
+        self.latencies = []
+
+    def pressed(self, sent=None):
+        self.pending.append(time.perf_counter() if sent is None else sent)
+
+    def drawn(self):
+        self.shown.extend(self.pending)
+        self.pending.clear()
+
+    def presented(self):
+        now = time.perf_counter()
+        for sent in self.shown:
+            self.latencies.append((now - sent) * 1000)
+        self.shown.clear()
+
+    """
+        Discard Function
+            - This function is responsible for forgetting presses that will never be drawn, like the ones
+            read just before the game ended
+    """
+
+    def discard(self):
+        self.pending.clear()
+        self.shown.clear()
+
+    """
+        Summary Function
+            - This function is responsible for summarizing the recorded latencies
+    """
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return {
+            "presses": len(latencies),
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+        }
+
+    """
+        Dump Function
+            - This function is responsible for writing the summary and every latency to a JSON file
+    """
+
+    def dump(self, path):
+        with open(path, "w") as file:
+            json.dump({"summary": self.summary(), "latencies": self.latencies}, file, indent=1)
+
+
+"""
+    Latency Bot Class
+        - This class is responsible for pressing keys on its own, so latency can be measured without
+        anyone at the keyboard
+            - A background thread posts a KEYDOWN for a random key from keys at random times, rate times
+            a second on average
+            - Each event carries the time it was posted as sent, so the time it waits in the event queue
+            counts towards its latency
+"""
+
+
+class LatencyBot:
+    def __init__(self, rate, keys, seed=None):
+        self.rate = rate
+        self.keys = list(keys)
+        self.rng = random.Random(seed)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.wait(self.rng.expovariate(self.rate)):
+            key = self.rng.choice(self.keys)
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, sent=time.perf_counter()))
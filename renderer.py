@@ -0,0 +1,385 @@
+import pygame
+
+from assets import assets, FONT
+
+# Sprite used for each lane type, and whether it needs per-pixel alpha
+LANE_IMAGES = {
+    "car": ("sprites/road.png", False),
+    "water": ("sprites/water.png", False),
+    "safe": ("sprites/bedroom.png", True),
+    "finish": ("sprites/gm_background.png", False),
+}
+
+# Sprite used for each obstacle type, scaled to OBSTACLE_SIZE, which is also the obstacle's collision box
+OBSTACLE_IMAGES = {
+    "car": "sprites/qline.png",
+    "water": "sprites/boat.png",
+}
+OBSTACLE_SIZE = (120, 120)
+
+POTHOLE_IMAGE = "sprites/pothole.png"
+FROG_IMAGE = "sprites/student.png"
+
+# Draw layers, back to front, the lanes come from the baked background and the HUD from the Score
+LAYER_LANES = 0
+LAYER_POTHOLES = 1
+LAYER_OBSTACLES = 2
+LAYER_FROG = 3
+LAYER_HUD = 4
+LAYER_COUNT = 5
+
+HUD_POSITION = (1000, 32)
+
+"""
+    Lerp Function
+        - This function is responsible for finding the point alpha of the way from start to end
+"""
+
+
+def lerp(start, end, alpha):
+    return start + (end - start) * alpha
+
+
+"""
+    Renderer Class
+        - This class is responsible for drawing a World onto a screen...
+            - The lanes
+            - The obstacles and their potholes
+            - The character
+            - The HUD
+        - This class only reads the world's state, it never changes it
+        - In dirty mode, only the rects touched by moving sprites and the HUD are repainted and pushed
+        to the display, instead of repainting and flipping the whole screen every frame
+        - When the playfield is taller than the window, a camera follows the character and every
+        playfield position is moved up by cameraY when drawn
+        - With a scale below 1, the world is drawn onto a smaller render target, scale times the window's
+        size, and stretched onto the window once per frame
+            - The world keeps its own coordinates, they are only scaled as they are drawn, by bakeLane()
+            for the lanes of the background and by draw() for everything on top of it
+            - The HUD and the profiler overlay are drawn onto the window after stretching, so text
+            stays sharp
+"""
+
+
+class Renderer:
+    def __init__(self, screen, dirty=False, scale=1.0):
+        self.screen = screen
+        self.dirty = dirty
+        self.scale = scale
+        self.target = None
+        self.fullRedraw = True
+        self.lastRects = []
+        self.updateRects = None
+        self.background = None
+        self.cameraY = 0
+
+        # Draw items by layer, the image of each kind of item, and the frame's blits() batch
+        self.layers = [[] for i in range(LAYER_COUNT)]
+        self.images = None
+        self.batch = []
+
+        # Background of the level after this one, baked a lane per frame by prebake()
+        self.nextBackground = None
+        self.nextLanes = None
+        self.nextBaked = 0
+
+        # Optional FrameProfiler and ProfilerOverlay, set by the Game when profiling is turned on
+        self.profiler = None
+        self.overlay = None
+
+        # Fraction of the screen pushed to the display, for the last frame and on average
+        self.updatedFraction = 1.0
+        self.fractionTotal = 0.0
+        self.frames = 0
+
+    """
+        Load Assets Function
+            - This function is responsible for warming the shared asset registry once the display exists
+            - After this runs, drawing a new level does not touch the disk
+    """
+
+    def loadAssets(self):
+        for path, alpha in LANE_IMAGES.values():
+            self.sprite(path, alpha=alpha)
+        self.spriteImages()
+        assets.font(FONT, 24)
+
+    """
+        Set Scale Function
+            - This function is responsible for changing the render scale
+            - Everything drawn at the old scale is thrown away, the next frame bakes and draws it again
+    """
+
+    def setScale(self, scale):
+        self.scale = scale
+        self.target = None
+        self.background = None
+        self.images = None
+        self.nextBackground = None
+        self.nextLanes = None
+        self.nextBaked = 0
+        self.reset()
+
+    """
+        Scaled Size Function
+            - This function is responsible for turning a size in world pixels into render target pixels
+    """
+
+    def scaledSize(self, size):
+        if self.scale == 1:
+            return tuple(size)
+        return (max(round(size[0] * self.scale), 1), max(round(size[1] * self.scale), 1))
+
+    """
+        Sprite Function
+            - This function is responsible for handing out an image at the size it is drawn on the render
+            target, size is its size in world pixels, its own size when not given
+    """
+
+    def sprite(self, path, size=None, alpha=True):
+        if self.scale != 1:
+            size = self.scaledSize(size if size is not None else assets.image(path, alpha=alpha).get_size())
+        return assets.image(path, size, alpha)
+
+    """
+        Canvas Function
+            - This function is responsible for handing out the surface the world is drawn onto
+            - That is the screen itself at full scale, and otherwise the render target, which is made again
+            whenever the window changed size
+    """
+
+    def canvas(self):
+        if self.scale == 1:
+            return self.screen
+        size = self.scaledSize(self.screen.get_size())
+        if self.target is None or self.target.get_size() != size:
+            self.target = self.newBackground(*size)
+            self.reset()
+        return self.target
+
+    """
+        Reset Function
+            - This function is responsible for forcing the next frame to be drawn in full
+            - bake() calls this whenever the level or the window changes
+    """
+
+    def reset(self):
+        self.fullRedraw = True
+        self.lastRects = []
+
+    """
+        New Background Function
+            - This function is responsible for making an empty background surface for a playfield size
+    """
+
+    def newBackground(self, width, height):
+        background = pygame.Surface((width, height))
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        background.fill((0, 0, 0))
+        return background
+
+    """
+        Bake Function
+            - This function is responsible for drawing every lane of the level onto one background surface
+            - Lanes never change within a level, so this only runs on a level change or window resize
+            - When prebake() already finished the background for these lanes, it is swapped in instead
+            - The background is baked at the render scale
+    """
+
+    def bake(self, world):
+        if self.nextLanes is world.lanes and self.nextBaked == len(world.lanes):
+            self.background = self.nextBackground
+        else:
+            self.background = self.newBackground(*self.scaledSize((world.width, world.height)))
+            for lane in world.lanes:
+                self.bakeLane(self.background, lane)
+
+        self.nextBackground = None
+        self.nextLanes = None
+        self.nextBaked = 0
+        self.reset()
+
+    """
+        Prebake Function
+            - This function is responsible for baking the next level's background while the current one
+            is played, one lane per call
+            - Only starts once the world has finished preparing the next level's lanes
+            - Returns True while there are lanes left to bake
+    """
+
+    def prebake(self, world):
+        if world.pending is not None:
+            return False
+
+        lanes = world.nextLanes
+        if self.nextLanes is not lanes:
+            self.nextBackground = self.newBackground(*self.scaledSize((world.width, world.fieldHeight(lanes))))
+            self.nextLanes = lanes
+            self.nextBaked = 0
+
+        if self.nextBaked < len(lanes):
+            self.bakeLane(self.nextBackground, lanes[self.nextBaked])
+            self.nextBaked += 1
+
+        if self.profiler is not None:
+            self.profiler.mark("prebake")
+        return self.nextBaked < len(lanes)
+
+    """
+        Bake Lane Function
+            - This function is responsible for drawing one lane onto a background
+            - The background is in playfield coordinates, so the lane is scaled but not moved by the camera
+    """
+
+    def bakeLane(self, background, lane):
+        path, alpha = LANE_IMAGES[lane.type]
+        scale = self.scale
+        background.blit(self.sprite(path, alpha=alpha), (lane.rect.x * scale, lane.rect.y * scale))
+
+    """
+        Update Camera Function
+            - This function is responsible for keeping the character in view when the playfield is taller
+            than the window
+            - The whole screen is redrawn when the camera moves
+    """
+
+    def updateCamera(self, world):
+        windowHeight = self.screen.get_height()
+        if world.height <= windowHeight:
+            cameraY = 0
+        else:
+            cameraY = int(world.frog.pos_y) - windowHeight // 2
+            cameraY = max(0, min(cameraY, world.height - windowHeight))
+
+        if cameraY != self.cameraY:
+            self.cameraY = cameraY
+            self.fullRedraw = True
+
+    """
+        Sprite Images Function
+            - This function is responsible for looking up the image drawn for each kind of draw item
+    """
+
+    def spriteImages(self):
+        self.images = {kind: self.sprite(path, OBSTACLE_SIZE) for kind, path in OBSTACLE_IMAGES.items()}
+        self.images["pothole"] = self.sprite(POTHOLE_IMAGE)
+        self.images["frog"] = self.sprite(FROG_IMAGE)
+
+    """
+        Draw Function
+            - This function is responsible for drawing the whole world in its current state
+            - alpha is how far the display is between the last two simulation steps, from 0 to 1
+            - The world hands over what to draw as (kind, x, y) items sorted into layers, and the whole
+            frame goes to the screen in a single blits() call, back to front...
+                - The lanes, restored from the baked background
+                - The potholes, the obstacles and the character
+                - The HUD
+            - In dirty mode, only the last frame's sprite rects are restored from the background, and the
+            rects to push to the display are worked out for present()
+            - Every item is scaled and moved up by the camera as it goes into the batch, the background is
+            moved up by the camera as it is restored
+            - Below full scale, the render target is stretched onto the window before the HUD goes on, and
+            the whole window is presented
+    """
+
+    def draw(self, world, alpha=1.0):
+        profiler = self.profiler
+        self.updateCamera(world)
+        canvas = self.canvas()
+        if self.background is None:
+            self.bake(world)
+        if self.images is None:
+            self.spriteImages()
+
+        scale = self.scale
+        cameraY = round(self.cameraY * scale)
+        batch = self.batch
+        batch.clear()
+
+        # Lanes, the whole screen or only where the last frame's sprites were
+        full = not self.dirty or self.fullRedraw
+        if full:
+            area = canvas.get_rect()
+            batch.append((self.background, area, area.move(0, cameraY)))
+        else:
+            for rect in self.lastRects:
+                batch.append((self.background, rect, rect.move(0, cameraY)))
+        restored = len(batch)
+        if profiler is not None:
+            profiler.mark("lanes.draw")
+
+        # Potholes, obstacles and the character, moving things are already drawn alpha of the way
+        layers = self.layers
+        for layer in layers:
+            layer.clear()
+        world.drawItems(alpha, layers)
+        images = self.images
+        for layer in layers[LAYER_POTHOLES:LAYER_HUD]:
+            for kind, pos_x, pos_y in layer:
+                batch.append((images[kind], (pos_x * scale, pos_y * scale - cameraY)))
+        if canvas is self.screen:
+            batch.append((world.score.hudSurface(), HUD_POSITION))
+
+        rects = canvas.blits(batch)[restored:]
+        if profiler is not None:
+            profiler.mark("sprites.draw")
+
+        if canvas is not self.screen:
+            pygame.transform.scale(canvas, self.screen.get_size(), self.screen)
+            self.screen.blit(world.score.hudSurface(), HUD_POSITION)
+            if profiler is not None:
+                profiler.mark("scale")
+
+        if self.overlay is not None and self.overlay.visible:
+            area = self.overlay.draw(self.screen)
+            if canvas is self.screen:
+                rects.append(area)
+        if profiler is not None:
+            profiler.mark("hud")
+
+        if full or canvas is not self.screen:
+            self.updateRects = None
+        # Pairing each sprite's old and new rect, so a small move is pushed as one small rect
+        elif len(rects) == len(self.lastRects):
+            self.updateRects = [old.union(new) for old, new in zip(self.lastRects, rects)]
+        else:
+            self.updateRects = self.lastRects + rects
+
+        self.lastRects = rects
+        self.fullRedraw = False
+
+    """
+        Present Function
+            - This function is responsible for showing the drawn frame on the display
+            - In dirty mode, only the rects worked out by draw() are pushed
+    """
+
+    def present(self):
+        screenRect = self.screen.get_rect()
+        if self.updateRects is None:
+            pygame.display.flip()
+            self.updatedFraction = 1.0
+        else:
+            pygame.display.update(self.updateRects)
+            area = 0
+            for rect in self.updateRects:
+                clip = rect.clip(screenRect)
+                area += clip.width * clip.height
+            self.updatedFraction = min(area / (screenRect.width * screenRect.height), 1.0)
+
+        self.fractionTotal += self.updatedFraction
+        self.frames += 1
+
+        if self.profiler is not None:
+            self.profiler.mark("flip")
+
+    """
+        Average Fraction Function
+            - This function is responsible for reporting the average fraction of the screen pushed per frame
+    """
+
+    def averageFraction(self):
+        if self.frames == 0:
+            return 0.0
+        return self.fractionTotal / self.frames
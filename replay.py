@@ -0,0 +1,211 @@
+import argparse
+import struct
+import sys
+import time
+
+"""
+    Recording Format
+        - A recording is a small binary file
+            - Header: b"FRGR", then version, seed, simulation rate, obstacles per lane and vectorized
+            - Events: how many ticks since the last event as a varint, then one code byte
+                - 0 to 3 are the moves in MOVE_CODES, applied on that tick
+                - RESET starts a fresh game on that tick
+                - END is the last event, followed by the final tick, level and lives
+        - Ticks are World.tick, the number of steps taken before the event
+"""
+
+MAGIC = b"FRGR"
+VERSION = 3
+HEADER = struct.Struct("<BQHHB")
+FOOTER = struct.Struct("<QII")
+
+# Largest seed and simulation rate the header has room for
+MAX_SEED = 2**64 - 1
+MAX_SIM_HZ = 2**16 - 1
+
+MOVE_CODES = {"left": 0, "right": 1, "up": 2, "down": 3}
+CODE_MOVES = {code: move for move, code in MOVE_CODES.items()}
+RESET = 4
+END = 255
+
+
+"""
+    Write Varint Function
+        - This function is responsible for writing a non-negative number in as few bytes as it needs
+"""
+
+
+def writeVarint(file, value):
+    while value >= 0x80:
+        file.write(bytes([(value & 0x7F) | 0x80]))
+        value >>= 7
+    file.write(bytes([value]))
+
+
+"""
+    Read Varint Function
+        - This function is responsible for reading a number written by writeVarint
+        - Returns None at the end of the data
+"""
+
+
+def readVarint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            return None, offset
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+"""
+    Input Recorder Class
+        - This class is responsible for writing a game's inputs to a recording as it is played
+            - record() logs the moves applied on a tick
+            - reset() logs a restart
+            - close() writes the final score so a replay can be checked against it
+        - Events are written through a buffered file, so recording costs a few bytes per key press
+"""
+
+
+class InputRecorder:
+    def __init__(self, path, world):
+        self.file = open(path, "wb")
+        self.lastTick = 0
+        self.file.write(MAGIC)
+        self.file.write(
+            HEADER.pack(VERSION, world.seed, world.simHz, world.obsCnt, world.store is not None)
+        )
+
+    def event(self, tick, code):
+        writeVarint(self.file, tick - self.lastTick)
+        self.file.write(bytes([code]))
+        self.lastTick = tick
+
+    def record(self, tick, inputs):
+        for move in inputs:
+            self.event(tick, MOVE_CODES[move])
+
+    def reset(self, tick):
+        self.event(tick, RESET)
+
+    def close(self, world):
+        self.event(world.tick, END)
+        self.file.write(FOOTER.pack(world.tick, world.score.level, world.score.lives))
+        self.file.close()
+
+
+"""
+    Load Recording Function
+        - This function is responsible for reading a recording back
+        - Returns the header fields, the list of (tick, code) events, and the final (tick, level, lives),
+        which is None when the game was not closed cleanly
+"""
+
+
+def loadRecording(path):
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a recording")
+    offset = len(MAGIC)
+    version, seed, simHz, obsCnt, vectorized = HEADER.unpack_from(data, offset)
+    if version != VERSION:
+        raise ValueError(f"{path} is recording version {version}, expected {VERSION}")
+    offset += HEADER.size
+
+    header = {"seed": seed, "simHz": simHz, "obsCnt": obsCnt, "vectorized": bool(vectorized)}
+    events = []
+    final = None
+    tick = 0
+    while True:
+        delta, offset = readVarint(data, offset)
+        if delta is None or offset >= len(data):
+            break
+        tick += delta
+        code = data[offset]
+        offset += 1
+        if code == END:
+            final = FOOTER.unpack_from(data, offset)
+            break
+        events.append((tick, code))
+
+    return header, events, final
+
+
+"""
+    Replay Function
+        - This function is responsible for playing a recording back on a headless world, as fast as the
+        CPU allows
+        - Returns the world once the last event has been played
+"""
+
+
+def replay(header, events, final=None):
+    from frogger_game_class import World
+
+    world = World(
+        obsCnt=header["obsCnt"],
+        vectorized=header["vectorized"],
+        simHz=header["simHz"],
+        seed=header["seed"],
+    )
+
+    lastTick = final[0] if final is not None else (events[-1][0] if events else 0)
+    index = 0
+    inputs = []
+    while True:
+        # Gathering everything that happens before the next step
+        while index < len(events) and events[index][0] == world.tick:
+            code = events[index][1]
+            if code == RESET:
+                world.reset()
+            else:
+                inputs.append(CODE_MOVES[code])
+            index += 1
+
+        if world.tick >= lastTick:
+            break
+        world.step(inputs)
+        inputs = []
+
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game headless")
+    parser.add_argument("recording")
+    args = parser.parse_args()
+
+    header, events, final = loadRecording(args.recording)
+
+    start = time.perf_counter()
+    world = replay(header, events, final)
+    elapsed = time.perf_counter() - start
+
+    gameTime = world.tick / header["simHz"]
+    speed = gameTime / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"Replayed {world.tick} ticks ({gameTime:.1f} s of play) in {elapsed:.3f} s, {speed:.0f}x real time"
+    )
+    print(f"Level {world.score.level}, lives {world.score.lives}")
+
+    if final is None:
+        print("Recording has no final score, nothing to check against")
+        return
+    expected = tuple(final)
+    actual = (world.tick, world.score.level, world.score.lives)
+    if actual != expected:
+        print(f"MISMATCH: recorded tick/level/lives {expected}, replay ended at {actual}")
+        sys.exit(1)
+    print("Replay matches the recording")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import argparse
+import array
+import asyncio
+import random
+import struct
+import sys
+import time
+
+from frogger_game_class import World
+from profiler import percentile
+from replay import CODE_MOVES
+
+"""
+    Game Server
+        - This script hosts many independent games in one process, for kiosk fleets and test harnesses
+            - Every session is a headless World of its own, all of them on one asyncio event loop
+            - One schedule steps every session at the shared simulation rate, the inputs a session
+            received since the last step are applied on the next one
+            - Clients connect over local TCP or a Unix socket, send moves, and get a compact state update
+            back every step
+        - A client that reads too slowly has state updates dropped rather than holding up the others
+        - Run it with: python server.py --port 7777 [--unix /tmp/frogger.sock]
+        - loadtest.py connects hundreds of clients to it
+"""
+
+"""
+    Protocol
+        - Every message is a type byte, a little-endian uint16 payload length, then the payload
+        - Client to server
+            - HELLO: seed (uint64, 0 for a random one) and obstacles per lane (uint8), must come first
+            - INPUT: one MOVE_CODES byte per move, applied on the session's next step
+            - RESET: starts a fresh game, after a game over or at any time
+        - Server to client
+            - WELCOME: session id (uint32), simulation rate (uint16) and the seed the session uses (uint64)
+            - LANES: sent whenever the lanes change, the level (uint16), the lane count (uint8), then per
+            lane its type (uint8, LANE_CODES), obstacle count (uint8) and pothole count (uint8), followed
+            by the x (int16) of every pothole in lane order, a pothole sits 32 px below its lane's top
+            - STATE: sent every step, the tick (uint32), level (uint16), lives (uint8), frog x and y
+            (int16), then the x (int16) of every obstacle in the order LANES counted them, an obstacle's
+            y is its lane's top
+"""
+
+HEADER = struct.Struct("<BH")
+
+HELLO = 1
+INPUT = 2
+RESET = 3
+
+WELCOME = 1
+LANES = 2
+STATE = 3
+
+HELLO_BODY = struct.Struct("<QB")
+WELCOME_BODY = struct.Struct("<IHQ")
+LANES_HEAD = struct.Struct("<HB")
+STATE_HEAD = struct.Struct("<IHBhh")
+
+LANE_CODES = {"car": 0, "water": 1, "safe": 2, "finish": 3}
+CODE_LANES = {code: type for type, code in LANE_CODES.items()}
+
+# Most steps the schedule catches up on at once, when it fell further behind the rest is skipped
+MAX_CATCH_UP = 5
+
+# Bytes a client may leave unread before its state updates are dropped
+WRITE_LIMIT = 64 * 1024
+
+
+"""
+    Pack Function
+        - This function is responsible for framing one message
+"""
+
+
+def pack(type, payload=b""):
+    return HEADER.pack(type, len(payload)) + payload
+
+
+"""
+    Read Message Function
+        - This function is responsible for reading one framed message from a stream
+        - Returns (type, payload), or (None, None) once the other side closed the connection
+"""
+
+
+async def readMessage(reader):
+    try:
+        type, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+        payload = await reader.readexactly(length) if length else b""
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None, None
+    return type, payload
+
+
+"""
+    Session Class
+        - This class is responsible for one client's game
+            - Moves received from the client wait in inputs until the next step
+            - The lanes are sent again whenever the world made new ones, the state after every step
+            - A finished game stands still until the client asks for a new one, its last state is only
+            sent once
+"""
+
+
+class Session:
+    def __init__(self, id, writer, seed, obsCnt, simHz):
+        self.id = id
+        self.writer = writer
+        self.world = World(obsCnt=obsCnt, simHz=simHz, seed=seed)
+        self.world.reset()
+        self.inputs = []
+        self.lanes = None
+        self.over = False
+        self.dropped = 0
+        self.sent = 0
+
+    def reset(self):
+        self.inputs.clear()
+        self.world.reset()
+        self.over = False
+
+    """
+        Step Function
+            - This function is responsible for advancing the game by one step and telling the client
+    """
+
+    def step(self):
+        world = self.world
+        if self.over:
+            return
+        world.step(self.inputs)
+        self.inputs.clear()
+        self.over = bool(world.score.gameOverCheck())
+        if world.lanes is not self.lanes:
+            self.lanes = world.lanes
+            self.send(self.lanesMessage())
+        elif self.writer.transport.get_write_buffer_size() > WRITE_LIMIT:
+            self.dropped += 1
+            return
+        self.send(self.stateMessage())
+
+    def send(self, message):
+        self.writer.write(message)
+        self.sent += len(message)
+
+    """
+        Lanes Message Function
+            - This function is responsible for describing the current lanes in a LANES message
+    """
+
+    def lanesMessage(self):
+        lanes = self.world.lanes
+        counts = bytearray()
+        potholes = array.array("h")
+        for lane in lanes:
+            holes = [obstacle.pothole_x for obstacle in lane.obstacles if obstacle.rect2 is not None]
+            counts += bytes((LANE_CODES[lane.type], len(lane.obstacles), len(holes)))
+            potholes.extend(round(x) for x in holes)
+        payload = LANES_HEAD.pack(self.world.score.level, len(lanes)) + bytes(counts) + potholes.tobytes()
+        return pack(LANES, payload)
+
+    """
+        State Message Function
+            - This function is responsible for describing where everything is in a STATE message
+    """
+
+    def stateMessage(self):
+        world = self.world
+        frog = world.frog
+        positions = array.array("h")
+        for lane in world.lanes:
+            positions.extend([round(obstacle.pos_x) for obstacle in lane.obstacles])
+        head = STATE_HEAD.pack(
+            world.tick, world.score.level, max(world.score.lives, 0), round(frog.pos_x), round(frog.pos_y)
+        )
+        return pack(STATE, head + positions.tobytes())
+
+
+"""
+    Game Server Class
+        - This class is responsible for accepting clients and stepping every session on one schedule
+        - The schedule keeps to the simulation rate by aiming each step at a deadline, so it never drifts,
+        and skips ahead when it fell more than MAX_CATCH_UP steps behind
+        - This class also keeps the numbers report() prints, how long stepping every session took and how
+        often the schedule fell behind
+"""
+
+
+class GameServer:
+    def __init__(self, simHz=30, obsCnt=1):
+        self.simHz = simHz
+        self.dt = 1 / simHz
+        self.obsCnt = obsCnt
+        self.sessions = {}
+        self.nextId = 1
+        self.stepTimes = []
+        self.skipped = 0
+        self.ticks = 0
+
+    """
+        Handle Client Function
+            - This function is responsible for one client's connection, from HELLO until it hangs up
+    """
+
+    async def handleClient(self, reader, writer):
+        session = None
+        try:
+            type, payload = await readMessage(reader)
+            if type != HELLO or len(payload) != HELLO_BODY.size:
+                return
+            seed, obsCnt = HELLO_BODY.unpack(payload)
+            if seed == 0:
+                seed = random.randrange(1, 2**32)
+            session = Session(self.nextId, writer, seed, obsCnt or self.obsCnt, self.simHz)
+            self.nextId += 1
+            self.sessions[session.id] = session
+            writer.write(pack(WELCOME, WELCOME_BODY.pack(session.id, self.simHz, seed)))
+
+            while True:
+                type, payload = await readMessage(reader)
+                if type is None:
+                    break
+                if type == INPUT:
+                    session.inputs.extend(CODE_MOVES[code] for code in payload if code in CODE_MOVES)
+                elif type == RESET:
+                    session.reset()
+        finally:
+            if session is not None:
+                del self.sessions[session.id]
+            writer.close()
+
+    """
+        Run Schedule Function
+            - This function is responsible for stepping every session at the simulation rate, for as long
+            as the server runs
+    """
+
+    async def runSchedule(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            deadline += self.dt
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif -delay > MAX_CATCH_UP * self.dt:
+                self.skipped += 1
+                deadline = loop.time()
+
+            start = time.perf_counter()
+            for session in list(self.sessions.values()):
+                session.step()
+            self.stepTimes.append(time.perf_counter() - start)
+            self.ticks += 1
+
+    """
+        Report Function
+            - This function is responsible for printing what the server did since the last report, and
+            starting the next one
+    """
+
+    def report(self, seconds):
+        times = sorted(self.stepTimes)
+        mean = sum(times) / len(times) * 1000 if times else 0.0
+        budget = self.dt * 1000
+        dropped = sum(session.dropped for session in self.sessions.values())
+        sent = sum(session.sent for session in self.sessions.values())
+        print(
+            f"{len(self.sessions)} sessions, {self.ticks / seconds:.1f} ticks/s, step all {mean:.2f} ms mean,"
+            f" {percentile(times, 0.99) * 1000:.2f} ms p99 of a {budget:.1f} ms budget, {self.skipped} skips,"
+            f" {sent / seconds / 1024:.0f} KiB/s sent, {dropped} states dropped",
+            flush=True,
+        )
+        self.stepTimes.clear()
+        self.ticks = 0
+        for session in self.sessions.values():
+            session.sent = 0
+
+    async def reportEvery(self, seconds):
+        while True:
+            await asyncio.sleep(seconds)
+            self.report(seconds)
+
+
+async def serve(args):
+    server = GameServer(simHz=args.sim_hz, obsCnt=args.obs_cnt)
+    listeners = []
+    if args.unix:
+        listeners.append(await asyncio.start_unix_server(server.handleClient, path=args.unix))
+        print(f"Listening on {args.unix}", flush=True)
+    if args.port or not args.unix:
+        listeners.append(await asyncio.start_server(server.handleClient, args.host, args.port))
+        print(f"Listening on {args.host}:{args.port}", flush=True)
+
+    tasks = [asyncio.create_task(server.runSchedule())]
+    if args.stats > 0:
+        tasks.append(asyncio.create_task(server.reportEvery(args.stats)))
+    await asyncio.gather(*tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many headless games over local sockets")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", metavar="PATH", help="also listen on a Unix socket, alone when --port is 0")
+    parser.add_argument("--sim-hz", type=int, default=30, help="simulation steps per second of every session")
+    parser.add_argument("--obs-cnt", type=int, default=1, help="obstacles per lane when a client asks for 0")
+    parser.add_argument("--stats", type=float, default=5, help="seconds between reports, 0 for none")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import inspect
+import sys
+import tracemalloc
+
+import pygame
+
+from frogger_game_class import Game, IntroScene, PlayScene, GameOverScene
+
+"""
+    Soak Test
+        - This script restarts the game thousands of times without a display, through the same
+        event queue and scene loop a player would use
+            - [S] on the intro screen, a few moves, lives run out, [R] on the game over screen, and again
+        - tracemalloc checks that memory stays flat once the game has warmed up, and the stack depth
+        inside the scenes is checked to never grow
+        - Run it with: python soak.py --restarts 5000
+"""
+
+
+"""
+    Press Function
+        - This function is responsible for queueing a key press like a player would
+"""
+
+
+def press(key):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+
+
+"""
+    Play Once Function
+        - This function is responsible for driving the game from the game over screen (or the intro)
+        through one full game and back to the game over screen
+"""
+
+
+def playOnce(game, startKey):
+    press(startKey)
+    game.frame()
+    assert isinstance(game.scene, PlayScene)
+
+    press(pygame.K_DOWN)
+    game.frame()
+
+    # Running the lives out, the play scene hands over to the game over screen on the next frame
+    while not game.world.score.gameOverCheck():
+        game.world.score.remove_life()
+    game.frame()
+    assert isinstance(game.scene, GameOverScene)
+    game.frame()
+
+
+"""
+    Watch Depth Function
+        - This function is responsible for recording the stack depth every time the world is stepped,
+        which is as deep inside the play scene as the game goes
+"""
+
+
+def watchDepth(world, depths):
+    step = world.step
+
+    def watchedStep(inputs=()):
+        depths.add(len(inspect.stack(0)))
+        return step(inputs)
+
+    world.step = watchedStep
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless restart soak test")
+    parser.add_argument("--restarts", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--budget", type=int, default=256 * 1024, help="allowed growth in bytes after warmup")
+    args = parser.parse_args()
+
+    # A very high simulation rate makes every uncapped frame run some simulation steps
+    game = Game(fps=0, simHz=100000)
+    game.switch(IntroScene(game))
+    game.frame()
+
+    depths = set()
+    watchDepth(game.world, depths)
+    playOnce(game, pygame.K_s)
+    for i in range(args.warmup):
+        playOnce(game, pygame.K_r)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(args.restarts):
+        playOnce(game, pygame.K_r)
+        if i % 500 == 0:
+            current = tracemalloc.get_traced_memory()[0]
+            print(f"restart {i:>6}: {current - baseline:>+8} bytes")
+    final = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    growth = final - baseline
+    print(f"{args.restarts} restarts, memory growth {growth:+} bytes, stack depths {sorted(depths)}")
+
+    ok = growth <= args.budget and len(depths) == 1
+    if not ok:
+        print("FAILED: memory or stack depth grew across restarts")
+    pygame.quit()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
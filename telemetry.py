@@ -0,0 +1,140 @@
+import json
+import queue
+import sys
+import threading
+import time
+
+# Put on the queue by close(), the writer thread stops once it reaches it
+CLOSE = object()
+
+
+"""
+    Telemetry Writer Class
+        - This class is responsible for writing gameplay events to a log without ever making the game wait
+        on the disk
+            - emit() only puts a small dict on a bounded queue, a background thread turns events into
+            JSON and appends them to the log in batches, through a buffered file
+            - The log is newline-delimited JSON, one event per line, each with its "event" type and "t",
+            the seconds since the writer started
+            - The file is flushed every flushInterval seconds and on close(), not on every batch
+        - When the queue is full, the event being emitted is dropped and counted, the events already
+        queued are kept
+            - The writer logs a "telemetry.dropped" event with the count the next time it writes, so a
+            log always says how much it is missing
+        - When writing fails, the writer says so once on stderr and stops, the events that were not flushed
+        yet are counted in lost, along with the ones still queued, and every event emitted after it is
+        dropped
+"""
+
+
+class TelemetryWriter:
+    def __init__(self, path, capacity=4096, batchSize=256, flushInterval=1.0):
+        self.path = path
+        self.queue = queue.Queue(capacity)
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+        self.started = time.perf_counter()
+        self.dropped = 0
+        self.reported = 0
+        self.written = 0
+        self.lost = 0
+        self.error = None
+        self.file = open(path, "a", buffering=64 * 1024)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    """
+        Emit Function
+            - This function is responsible for handing one event to the writer thread
+            - Never blocks, returns False when the event was dropped
+    """
+
+    def emit(self, event, **fields):
+        if self.error is not None:
+            self.dropped += 1
+            return False
+        fields["event"] = event
+        fields["t"] = time.perf_counter() - self.started
+        try:
+            self.queue.put_nowait(fields)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    """
+        Run Function
+            - This function is responsible for the writer thread, taking batches of events off the queue and
+            appending them to the log until close() is called, or until writing fails
+    """
+
+    def run(self):
+        lastFlush = time.perf_counter()
+        pending = 0
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flushInterval)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < self.batchSize:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = CLOSE in batch
+            lines = [json.dumps(event, separators=(",", ":")) for event in batch if event is not CLOSE]
+            dropped = self.dropped
+            if dropped != self.reported:
+                lines.append(json.dumps({"event": "telemetry.dropped", "count": dropped - self.reported}))
+                self.reported = dropped
+            # Events only count as written once they were flushed
+            pending += len(batch) - closing
+            try:
+                if lines:
+                    self.file.write("\n".join(lines) + "\n")
+
+                now = time.perf_counter()
+                if closing or now - lastFlush >= self.flushInterval:
+                    self.file.flush()
+                    self.written += pending
+                    pending = 0
+                    lastFlush = now
+            except OSError as error:
+                self.lost += pending
+                self.error = error
+                print(f"Telemetry stopped, could not write to {self.path}: {error}", file=sys.stderr)
+                break
+            if closing:
+                break
+
+    """
+        Close Function
+            - This function is responsible for writing whatever is still queued and closing the log
+            - Waits up to timeout seconds for the writer thread, so it is only called when the game shuts down
+            - A writer that stopped on an error is not waited for, one still stuck on the disk after timeout
+            is left behind, it is a daemon thread
+            - Returns True when the log was closed
+    """
+
+    def close(self, timeout=5.0):
+        if self.thread.is_alive():
+            try:
+                self.queue.put(CLOSE, timeout=timeout)
+            except queue.Full:
+                pass
+            self.thread.join(timeout)
+        if self.thread.is_alive():
+            return False
+
+        # The events still queued when the writer stopped on an error never reach the log
+        while True:
+            try:
+                self.lost += self.queue.get_nowait() is not CLOSE
+            except queue.Empty:
+                break
+        try:
+            self.file.close()
+        except OSError:
+            pass
+        return True
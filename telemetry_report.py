@@ -0,0 +1,173 @@
+import argparse
+import json
+import sys
+from collections import Counter
+
+from profiler import percentile
+
+"""
+    Telemetry Report
+        - This script rolls a telemetry log written with --telemetry up into per-level stats
+            - How often each level was started and finished, and how long finishing it took
+            - What the frog lost its lives to on each level, and in which kind of lane
+            - How many games were played, restarted and lost on each level
+        - It also sums up the frame time summaries, and how many events the writer had to drop
+        - Several logs can be read at once, a line cut short by a crash is skipped and counted
+        - Run it with: python telemetry_report.py telemetry.ndjson [--json]
+"""
+
+
+"""
+    Level Stats Class
+        - This class is responsible for adding up one level's events
+"""
+
+
+class LevelStats:
+    def __init__(self, level):
+        self.level = level
+        self.starts = 0
+        self.finishes = 0
+        self.gameOvers = 0
+        self.durations = []
+        self.causes = Counter()
+        self.laneTypes = Counter()
+
+    def add(self, event):
+        kind = event["event"]
+        if kind == "level.start":
+            self.starts += 1
+        elif kind == "level.finish":
+            self.finishes += 1
+            self.durations.append(event["seconds"])
+        elif kind == "death":
+            self.causes[event.get("cause") or "unknown"] += 1
+            self.laneTypes[event.get("laneType") or "unknown"] += 1
+        elif kind == "game.over":
+            self.gameOvers += 1
+
+    """
+        Summary Function
+            - This function is responsible for the level's stats as a dict, durations in seconds
+    """
+
+    def summary(self):
+        durations = sorted(self.durations)
+        deaths = sum(self.causes.values())
+        return {
+            "level": self.level,
+            "starts": self.starts,
+            "finishes": self.finishes,
+            "finishRate": self.finishes / self.starts if self.starts else 0.0,
+            "meanSeconds": sum(durations) / len(durations) if durations else 0.0,
+            "p50Seconds": percentile(durations, 0.50),
+            "p90Seconds": percentile(durations, 0.90),
+            "deaths": deaths,
+            "deathsPerStart": deaths / self.starts if self.starts else 0.0,
+            "causes": dict(self.causes.most_common()),
+            "laneTypes": dict(self.laneTypes.most_common()),
+            "gameOvers": self.gameOvers,
+        }
+
+
+"""
+    Roll Up Function
+        - This function is responsible for reading every event of the logs and adding them up
+        - Returns a dict with the per-level stats under "levels", and the totals for the whole log
+"""
+
+
+def rollUp(paths):
+    levels = {}
+    totals = Counter()
+    frames = {"count": 0, "total": 0.0, "p99": 0.0, "max": 0.0}
+
+    for path in paths:
+        with open(path) as file:
+            for line in file:
+                try:
+                    event = json.loads(line)
+                    kind = event["event"]
+                except (ValueError, KeyError):
+                    totals["malformed"] += 1
+                    continue
+
+                if "level" in event and kind != "frames":
+                    level = event["level"]
+                    if level not in levels:
+                        levels[level] = LevelStats(level)
+                    levels[level].add(event)
+                if kind == "game.start":
+                    totals["games"] += 1
+                    totals["restarts"] += bool(event.get("restart"))
+                elif kind == "game.quit":
+                    totals["quits"] += 1
+                elif kind == "telemetry.dropped":
+                    totals["dropped"] += event["count"]
+                elif kind == "frames":
+                    # Averaging the means by how many frames each covered, the p99 is the worst one seen
+                    frames["count"] += event["count"]
+                    frames["total"] += event["mean"] * event["count"]
+                    frames["p99"] = max(frames["p99"], event["p99"])
+                    frames["max"] = max(frames["max"], event["max"])
+
+    return {
+        "games": totals["games"],
+        "restarts": totals["restarts"],
+        "quits": totals["quits"],
+        "dropped": totals["dropped"],
+        "malformed": totals["malformed"],
+        "frames": {
+            "count": frames["count"],
+            "mean": frames["total"] / frames["count"] if frames["count"] else 0.0,
+            "worstP99": frames["p99"],
+            "max": frames["max"],
+        },
+        "levels": [levels[level].summary() for level in sorted(levels)],
+    }
+
+
+"""
+    Print Report Function
+        - This function is responsible for printing the roll up as a table, one row per level
+"""
+
+
+def printReport(report):
+    print(
+        f"{report['games']} games, {report['restarts']} restarts, {report['quits']} quits,"
+        f" {report['dropped']} events dropped, {report['malformed']} malformed lines"
+    )
+    frames = report["frames"]
+    if frames["count"]:
+        print(
+            f"{frames['count']} frames, {frames['mean']:.2f} ms mean, worst p99 {frames['worstP99']:.2f} ms,"
+            f" slowest {frames['max']:.2f} ms"
+        )
+    print()
+    print(f"{'level':>5} {'starts':>6} {'done':>5} {'rate':>5} {'mean s':>7} {'p90 s':>6} {'deaths':>6} {'lost':>4}  causes")
+    for level in report["levels"]:
+        causes = ", ".join(f"{cause} {count}" for cause, count in level["causes"].items())
+        print(
+            f"{level['level']:>5} {level['starts']:>6} {level['finishes']:>5} {level['finishRate']:>5.0%}"
+            f" {level['meanSeconds']:>7.1f} {level['p90Seconds']:>6.1f} {level['deaths']:>6} {level['gameOvers']:>4}"
+            f"  {causes}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll a telemetry log up into per-level stats")
+    parser.add_argument("logs", nargs="+", metavar="LOG", help="telemetry logs written with --telemetry")
+    parser.add_argument("--json", action="store_true", help="print the roll up as JSON instead of a table")
+    args = parser.parse_args()
+
+    report = rollUp(args.logs)
+    if args.json:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    else:
+        printReport(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from assets import assets
+from frogger_game_class import World, MOVES, FROG_SIZE, POTHOLE_SIZE
+from obstacle_store import _round
+from renderer import OBSTACLE_IMAGES, OBSTACLE_SIZE, POTHOLE_IMAGE, FROG_IMAGE
+
+"""
+    Batched Environment
+        - This module runs many independent games at once, with the state of every game in NumPy arrays
+            - One step() call advances every game by one simulation step
+            - Obstacle motion, the frog, collisions, lives and levels follow World.step exactly
+            - Pixel-accurate collisions are looked up in tables of every offset at which the frog's mask
+            touches a sprite's mask, built once from the same masks Lane.check uses
+            - Levels are still made by World, one small World per game that only generates lanes, so a
+            game seeded with s lays out its levels like World(seed=s) does
+        - Run it with: python vec_env.py --envs 4096 --steps 1000 to measure throughput, or
+        python vec_env.py --check to compare it step by step against World
+"""
+
+# Lane types, as stored in the laneType array
+NONE = -1
+SAFE = 0
+CAR = 1
+WATER = 2
+FINISH = 3
+LANE_TYPES = {"safe": SAFE, "car": CAR, "water": WATER, "finish": FINISH}
+
+# Actions, 0 does nothing and the others are the moves of World.step
+ACTIONS = (None, "left", "right", "up", "down")
+ACTION_DX = np.array([0] + [MOVES[move][0] for move in ACTIONS[1:]], dtype=np.float64)
+ACTION_DY = np.array([0] + [MOVES[move][1] for move in ACTIONS[1:]], dtype=np.float64)
+
+# Most lanes a level can have, the safe lane, 9 car lanes and the finish lane
+MAX_LANES = 11
+
+# Positions World uses, in pixels
+FROG_START = (640, 56)
+OBSTACLE_WIDTH = 256
+SCREEN_WIDTH = 1280
+POTHOLE_OFFSET = 32
+
+"""
+    Overlap Table Function
+        - This function is responsible for working out, for every offset at which two rects overlap,
+        whether their masks overlap too
+        - The entry for other's rect at (dx, dy) from mask's rect is table[dy + otherHeight - 1, dx + otherWidth - 1]
+"""
+
+
+def overlapTable(mask, other):
+    width, height = mask.get_size()
+    otherWidth, otherHeight = other.get_size()
+    table = np.zeros((height + otherHeight - 1, width + otherWidth - 1), dtype=np.bool_)
+    for dy in range(-otherHeight + 1, height):
+        for dx in range(-otherWidth + 1, width):
+            table[dy + otherHeight - 1, dx + otherWidth - 1] = mask.overlap(other, (dx, dy)) is not None
+    return table
+
+
+"""
+    Touching Function
+        - This function is responsible for looking up, for arrays of offsets, whether the masks overlap
+        - Offsets outside the table are ones where not even the rects overlap
+"""
+
+
+def touching(table, dx, dy, otherSize):
+    row = dy + otherSize[1] - 1
+    column = dx + otherSize[0] - 1
+    inside = (row >= 0) & (row < table.shape[-2]) & (column >= 0) & (column < table.shape[-1])
+    return inside & table[..., np.clip(row, 0, table.shape[-2] - 1), np.clip(column, 0, table.shape[-1] - 1)]
+
+
+"""
+    Vec Env Class
+        - This class is responsible for running numEnvs games side by side
+            - step(actions) takes one action per game and returns the rewards and done flags
+            - A game is done when its lives run out, it starts over straight away
+            - Rewards are +1 for reaching the finish lane and -1 for losing a life
+        - The state of every game can be read from the arrays...
+            - frogX, frogY, attachedV: the frog's position and the velocity of the boat it rides
+            - lives, level, laneCount, laneType
+            - obsX, obsV, obsValid: obstacles, by game, lane and slot
+        - When a frog lands on several boats at once, it rides the one furthest right, the last one in
+        the LaneIndex order World checks them in
+"""
+
+
+class VecEnv:
+    def __init__(self, numEnvs, obsCnt=1, simHz=30, seed=0):
+        self.numEnvs = numEnvs
+        self.obsCnt = obsCnt
+        self.dt = 1 / simHz
+        self.rows = np.arange(numEnvs)
+
+        self.laneType = np.full((numEnvs, MAX_LANES), NONE, dtype=np.int8)
+        self.laneCount = np.zeros(numEnvs, dtype=np.int64)
+        self.height = np.zeros(numEnvs, dtype=np.int64)
+        self.obsX = np.zeros((numEnvs, MAX_LANES, obsCnt), dtype=np.float64)
+        self.obsPrevX = np.zeros((numEnvs, MAX_LANES, obsCnt), dtype=np.float64)
+        self.obsV = np.zeros((numEnvs, MAX_LANES, obsCnt), dtype=np.float64)
+        self.obsValid = np.zeros((numEnvs, MAX_LANES, obsCnt), dtype=np.bool_)
+        self.potLeft = np.zeros((numEnvs, MAX_LANES, obsCnt), dtype=np.int64)
+        self.potValid = np.zeros((numEnvs, MAX_LANES, obsCnt), dtype=np.bool_)
+
+        # Where the frog's mask touches a car, a boat and a pothole
+        frogMask = assets.mask(FROG_IMAGE)
+        self.carTable = overlapTable(frogMask, assets.mask(OBSTACLE_IMAGES["car"], OBSTACLE_SIZE))
+        self.waterTable = overlapTable(frogMask, assets.mask(OBSTACLE_IMAGES["water"], OBSTACLE_SIZE))
+        self.potholeTable = overlapTable(frogMask, assets.mask(POTHOLE_IMAGE))
+
+        self.frogX = np.full(numEnvs, FROG_START[0], dtype=np.float64)
+        self.frogY = np.full(numEnvs, FROG_START[1], dtype=np.float64)
+        self.attachedV = np.zeros(numEnvs, dtype=np.float64)
+        self.lives = np.full(numEnvs, 5, dtype=np.int64)
+        self.level = np.ones(numEnvs, dtype=np.int64)
+
+        # How many lanes of the next level World would have prepared since the level started
+        self.prepared = np.zeros(numEnvs, dtype=np.int64)
+
+        self.episodes = 0
+        self.worlds = []
+        for i in range(numEnvs):
+            world = World(obsCnt=obsCnt, simHz=simHz, seed=seed + i)
+            world.reset()
+            self.worlds.append(world)
+            self.load(i)
+
+    """
+        Load Function
+            - This function is responsible for copying the lanes of game i's World into the arrays
+    """
+
+    def load(self, i):
+        world = self.worlds[i]
+        self.laneCount[i] = len(world.lanes)
+        self.height[i] = world.height
+        self.level[i] = world.score.level
+        self.laneType[i] = NONE
+        self.obsValid[i] = False
+        self.potValid[i] = False
+        for l, lane in enumerate(world.lanes):
+            self.laneType[i, l] = LANE_TYPES[lane.type]
+            for k, obstacle in enumerate(lane.obstacles):
+                self.obsX[i, l, k] = obstacle.pos_x
+                self.obsV[i, l, k] = obstacle.velocity
+                self.obsValid[i, l, k] = True
+                if obstacle.rect2 is not None:
+                    self.potLeft[i, l, k] = obstacle.rect2.x
+                    self.potValid[i, l, k] = True
+        self.prepared[i] = 0
+
+    """
+        Next Level Function
+            - This function is responsible for moving game i to its next level
+    """
+
+    def nextLevel(self, i):
+        world = self.worlds[i]
+        world.score.advance_level()
+        world.startNextLevel()
+        self.load(i)
+
+    """
+        Restart Function
+            - This function is responsible for starting game i over once its lives ran out
+            - World would have prepared part of the next level by now, drawing from its random.Random,
+            so the same number of lanes are prepared before the restart to keep the draws in step
+    """
+
+    def restart(self, i):
+        world = self.worlds[i]
+        for k in range(self.prepared[i]):
+            if not world.prepare():
+                break
+        world.reset()
+        self.load(i)
+        self.lives[i] = 5
+        self.episodes += 1
+
+    """
+        Step Function
+            - This function is responsible for advancing every game by one simulation step
+            - actions holds one entry of ACTIONS per game, as an index
+            - Returns the rewards and done flags, one per game
+    """
+
+    def step(self, actions):
+        rows = self.rows
+        actions = np.asarray(actions)
+
+        # Moving the frogs
+        self.frogX += ACTION_DX[actions] * 128
+        self.frogY += ACTION_DY[actions] * 128
+
+        # Moving the obstacles, and restarting the ones that ran off the edge on the other side
+        x = self.obsX
+        velocity = self.obsV
+        self.obsPrevX[:] = x
+        x += velocity * self.dt
+        x[(velocity > 0) & (x > SCREEN_WIDTH + 64)] = -OBSTACLE_WIDTH
+        x[(velocity < 0) & (x < -OBSTACLE_WIDTH)] = SCREEN_WIDTH
+
+        # Carrying the frogs along on their boats, then keeping them on the playfield
+        frogX = self.frogX
+        frogY = self.frogY
+        frogX += self.attachedV * self.dt
+        frogX[frogX + 16 > SCREEN_WIDTH] = SCREEN_WIDTH - 16
+        frogX[frogX < 0] = 0
+        np.minimum(frogY, self.height - 16, out=frogY)
+        frogY[frogY < 0] = 32
+
+        # Checking every lane each frog's rect overlaps, at most two
+        frogLeft = _round(frogX).astype(np.int64)
+        frogTop = _round(frogY).astype(np.int64)
+        first = np.maximum(frogTop // 128, 0)
+        last = np.minimum((frogTop + FROG_SIZE[1] - 1) // 128, self.laneCount - 1)
+
+        self.attachedV[:] = 0
+        dead = np.zeros(self.numEnvs, dtype=np.bool_)
+        finish = np.zeros(self.numEnvs, dtype=np.bool_)
+        for slot in range(2):
+            lane = first + slot
+            active = (lane <= last) & ~dead
+            if not active.any():
+                break
+            lane = np.minimum(lane, MAX_LANES - 1)
+            types = np.where(active, self.laneType[rows, lane], NONE)
+
+            water = types == WATER
+            obstacleLeft = _round(self.obsX[rows, lane]).astype(np.int64)
+            dx = obstacleLeft - frogLeft[:, None]
+            dy = (lane * 128 - frogTop)[:, None]
+            hits = self.obsValid[rows, lane] & np.where(
+                water[:, None],
+                touching(self.waterTable, dx, dy, OBSTACLE_SIZE),
+                touching(self.carTable, dx, dy, OBSTACLE_SIZE),
+            )
+            anyHit = hits.any(axis=1)
+
+            # Potholes count as cars
+            dx = self.potLeft[rows, lane] - frogLeft[:, None]
+            dy = (lane * 128 + POTHOLE_OFFSET - frogTop)[:, None]
+            potholeHit = (self.potValid[rows, lane] & touching(self.potholeTable, dx, dy, POTHOLE_SIZE)).any(axis=1)
+
+            # Riding the boat furthest right, boats level with each other are told apart by where they
+            # were the step before, like the LaneIndex order
+            previousLeft = _round(self.obsPrevX[rows, lane]).astype(np.int64)
+            key = ((obstacleLeft + 4096) * 8192 + previousLeft + 4096) * self.obsCnt + np.arange(self.obsCnt)
+            key[~hits] = -1
+            boat = key.argmax(axis=1)
+            riding = water & anyHit
+            self.attachedV[riding] = self.obsV[rows, lane, boat][riding]
+
+            dead |= ((types == CAR) & (anyHit | potholeHit)) | (water & ~anyHit)
+            finish |= types == FINISH
+
+        finish &= ~dead
+        reset = dead | finish
+        frogX[reset] = FROG_START[0]
+        frogY[reset] = FROG_START[1]
+        self.attachedV[reset] = 0
+
+        rewards = np.zeros(self.numEnvs, dtype=np.float32)
+        rewards[dead] = -1
+        rewards[finish] = 1
+        self.lives -= dead
+        self.prepared += ~finish
+
+        for i in np.flatnonzero(finish):
+            self.nextLevel(i)
+
+        dones = self.lives <= 0
+        for i in np.flatnonzero(dones):
+            self.restart(i)
+
+        return rewards, dones
+
+
+"""
+    Check Function
+        - This function is responsible for playing the same games on VecEnv and on World side by side,
+        with the same random actions, and counting the steps where they disagree
+"""
+
+
+def check(numEnvs, steps, obsCnt, seed):
+    env = VecEnv(numEnvs, obsCnt=obsCnt, seed=seed)
+    worlds = []
+    for i in range(numEnvs):
+        world = World(obsCnt=obsCnt, seed=seed + i)
+        world.reset()
+        worlds.append(world)
+
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    finishes = 0
+    gameovers = 0
+    for t in range(steps):
+        actions = rng.choice(len(ACTIONS), size=numEnvs, p=[0.6, 0.05, 0.05, 0.05, 0.25])
+        rewards, dones = env.step(actions)
+        finishes += int((rewards > 0).sum())
+
+        for i, world in enumerate(worlds):
+            inputs = [ACTIONS[actions[i]]] if actions[i] else []
+            world.step(inputs)
+            if world.score.gameover:
+                gameovers += 1
+                world.reset()
+
+            attached = world.frog.attached.velocity if world.frog.attached is not None else 0
+            expected = (world.frog.pos_x, world.frog.pos_y, attached, world.score.lives, world.score.level)
+            actual = (env.frogX[i], env.frogY[i], env.attachedV[i], env.lives[i], env.level[i])
+            obstacles = [obstacle.pos_x for lane in world.lanes for obstacle in lane.obstacles]
+            valid = env.obsValid[i]
+            if expected != actual or obstacles != list(env.obsX[i][valid]):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"step {t} game {i}: World {expected}, VecEnv {actual}")
+
+    print(f"{numEnvs} games x {steps} steps, {finishes} levels finished, {gameovers} game overs")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched Frogger environment")
+    parser.add_argument("--envs", type=int, default=4096, help="games run side by side")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--obs-cnt", type=int, default=1, help="obstacles per lane")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="compare against World instead of timing")
+    args = parser.parse_args()
+
+    if args.check:
+        mismatches = check(min(args.envs, 64), args.steps, args.obs_cnt, args.seed)
+        if mismatches:
+            print(f"MISMATCH on {mismatches} game-steps")
+            sys.exit(1)
+        print("VecEnv matches World")
+        return
+
+    env = VecEnv(args.envs, obsCnt=args.obs_cnt, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+    actions = rng.integers(0, len(ACTIONS), size=(args.steps, args.envs))
+
+    start = time.perf_counter()
+    for t in range(args.steps):
+        env.step(actions[t])
+    elapsed = time.perf_counter() - start
+
+    total = args.envs * args.steps
+    print(f"{total} game-steps in {elapsed:.2f} s, {total / elapsed:,.0f} game-steps per second")
+    print(f"{env.episodes} games over, furthest level {env.level.max()}")
+
+
+if __name__ == "__main__":
+    main()